@@ -0,0 +1,54 @@
+"""
+標準モードとハイパーキューブモードの署名・検証時間の比較
+
+python3 -m benchmarks.hypercube
+"""
+
+import time
+
+from src.group import get_parameters
+from src.mpcith import keygen, sign, verify_signature
+
+from .suite import SEED, repetitions
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(q_bits: int = 160, repeat: int = 3):
+    params = get_parameters(q_bits=q_bits, seed=SEED)
+    key_pair = keygen(params)
+    message = b"benchmark"
+    print(f"q_bits={q_bits}")
+    print(f"{'N':>5} {'m':>4} {'mode':>10} {'sign[ms]':>10} {'verify[ms]':>11}")
+    for n in (16, 64, 256):
+        m = repetitions(n)
+        for mode in ("standard", "hypercube"):
+            sig = sign(message, key_pair.secret, params, n, m, mode=mode)
+            assert verify_signature(
+                sig, message, params, key_pair.public, mode=mode
+            )
+            t_sign = _time(
+                lambda: sign(message, key_pair.secret, params, n, m, mode=mode),
+                repeat,
+            )
+            t_verify = _time(
+                lambda: verify_signature(
+                    sig, message, params, key_pair.public, mode=mode
+                ),
+                repeat,
+            )
+            print(
+                f"{n:>5} {m:>4} {mode:>10} "
+                f"{t_sign * 1e3:>10.1f} {t_verify * 1e3:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
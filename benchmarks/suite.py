@@ -0,0 +1,322 @@
+"""
+鍵生成・署名・検証と MQ 計算のベンチマーク
+
+python3 -m benchmarks.suite --out results.json
+python3 -m benchmarks.suite --compare baseline.json  (退行があれば終了コード 1)
+
+各ケースについて中央値・p95 の所要時間 [ms]、ops/sec、
+ピークメモリ (tracemalloc, KiB)、署名サイズ (バイト) を JSON に書き出す
+"""
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src import _kernels, mpcith, mqom, schnorr_fs
+from src._mqom import MQMPCParameter, compute_z_w
+from src.finite_field import FqNArray
+from src.group import generate_parameters, get_parameters
+from src.mq_problem import MqProblem
+from src.seed_tree import SEED_LEN
+
+SECURITY_BITS = 128
+SEED = b"benchmarks"  # get_parameters で使い回すパラメータの seed
+MESSAGE = b"benchmark"
+
+# 退行と判定する既定の比 (現在 / 基準)
+DEFAULT_THRESHOLD = 1.2
+
+
+@dataclass(frozen=True)
+class Grid:
+    q_bits: Tuple[int, ...]
+    parties: Tuple[int, ...]
+    mq_sizes: Tuple[Tuple[int, int], ...]  # (n, m)
+
+
+QUICK = Grid(q_bits=(16, 64), parties=(16, 64), mq_sizes=((16, 16), (49, 49)))
+FULL = Grid(
+    q_bits=(16, 64, 160, 256),
+    parties=(16, 64, 256),
+    mq_sizes=((16, 16), (49, 49), (64, 64)),
+)
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    params: Dict[str, object]
+    fn: Callable[[], object]
+    sig_bytes: Optional[int] = None
+
+
+def repetitions(n_parties: int) -> int:
+    # (1/N)^m <= 2^-128 となる繰り返し数
+    return -(-SECURITY_BITS // (n_parties.bit_length() - 1))
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    fn()  # ウォームアップ (表の構築・JIT のコンパイルなど)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    # ピークメモリは計測を歪めないよう別に 1 回だけ測る
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    median = statistics.median(samples)
+    p95 = samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+    return {
+        "median_ms": median * 1e3,
+        "p95_ms": p95 * 1e3,
+        "ops_per_sec": 1.0 / median if median > 0 else math.inf,
+        "peak_kib": peak / 1024,
+    }
+
+
+def _parameter_cases(grid: Grid) -> Iterator[Case]:
+    for q_bits in grid.q_bits:
+        yield Case(
+            "generate_parameters",
+            {"q_bits": q_bits},
+            lambda q_bits=q_bits: generate_parameters(q_bits=q_bits),
+        )
+
+
+def _schnorr_cases(grid: Grid) -> Iterator[Case]:
+    for q_bits in grid.q_bits:
+        params = get_parameters(q_bits=q_bits, seed=SEED)
+        kp = schnorr_fs.keygen(params)
+        sig = schnorr_fs.sign(params, kp.x, kp.y, MESSAGE)
+        size = params.p_len + 2 * params.q_len
+        yield Case(
+            "schnorr.sign",
+            {"q_bits": q_bits},
+            lambda p=params, kp=kp: schnorr_fs.sign(p, kp.x, kp.y, MESSAGE),
+            size,
+        )
+        yield Case(
+            "schnorr.verify",
+            {"q_bits": q_bits},
+            lambda p=params, kp=kp, s=sig: schnorr_fs.verify(
+                p, kp.y, MESSAGE, s
+            ),
+            size,
+        )
+
+
+def _mpcith_cases(grid: Grid) -> Iterator[Case]:
+    for q_bits in grid.q_bits:
+        params = get_parameters(q_bits=q_bits, seed=SEED)
+        yield Case(
+            "mpcith.keygen",
+            {"q_bits": q_bits},
+            lambda p=params: mpcith.keygen(p),
+        )
+        kp = mpcith.keygen(params)
+        for n in grid.parties:
+            m = repetitions(n)
+            for mode in ("standard", "hypercube"):
+                sig = mpcith.sign(MESSAGE, kp.secret, params, n, m, mode=mode)
+                size = len(sig.to_bytes(params))
+                args = {"q_bits": q_bits, "N": n, "m": m, "mode": mode}
+                yield Case(
+                    "mpcith.sign",
+                    args,
+                    lambda p=params, n=n, m=m, mode=mode, x=kp.secret: (
+                        mpcith.sign(MESSAGE, x, p, n, m, mode=mode)
+                    ),
+                    size,
+                )
+                yield Case(
+                    "mpcith.verify_signature",
+                    args,
+                    lambda p=params, s=sig, mode=mode, y=kp.public: (
+                        mpcith.verify_signature(s, MESSAGE, p, y, mode=mode)
+                    ),
+                    size,
+                )
+
+
+def _mq_cases(grid: Grid) -> Iterator[Case]:
+    for n, m in grid.mq_sizes:
+        param = MQMPCParameter(n=n, m=m)
+        args = {"n": n, "m": m, "q": param.q}
+        yield Case(
+            "MqProblem",
+            args,
+            lambda n=n, m=m, q=param.q: MqProblem(n=n, m=m, q=q),
+        )
+        mq = MqProblem(n=n, m=m, q=param.q)
+        gamma = FqNArray.random(param.q, param.eta, m)
+        yield Case(
+            "compute_z_w",
+            dict(args, eta=param.eta),
+            lambda mq=mq, p=param, g=gamma: compute_z_w(mq, p, gamma=g),
+        )
+
+
+def mqom_signature_bytes(sig: mqom.MQOMSignature, q: int) -> int:
+    """F_q の元を ceil(log2 q / 8) バイトで符号化した場合の署名長"""
+    elem = (q.bit_length() + 7) // 8
+    size = len(sig.salt) + len(sig.challenge_seed)
+    for rd in sig.rounds:
+        n_elems = rd.alpha.coeffs.size + rd.beta.coeffs.size
+        if rd.aux is not None:
+            n_elems += rd.aux.values.size
+        size += 2 + len(rd.seed_path) * SEED_LEN + len(rd.hidden_commit)
+        size += n_elems * elem
+    return size
+
+
+def _mqom_cases(grid: Grid) -> Iterator[Case]:
+    # 離散対数版 (mpcith) と同じ N, 既定の MQ パラメータで比較する
+    for n_parties in grid.parties:
+        param = MQMPCParameter(N=n_parties, tau=repetitions(n_parties))
+        args = {"N": n_parties, "tau": param.tau, "n": param.n, "m": param.m}
+        kp = mqom.keygen(param)
+        sig = mqom.sign(MESSAGE, kp, param)
+        size = mqom_signature_bytes(sig, param.q)
+        yield Case("mqom.keygen", args, lambda p=param: mqom.keygen(p))
+        yield Case(
+            "mqom.sign",
+            args,
+            lambda p=param, kp=kp: mqom.sign(MESSAGE, kp, p),
+            size,
+        )
+        yield Case(
+            "mqom.verify",
+            args,
+            lambda p=param, kp=kp, s=sig: mqom.verify(MESSAGE, s, kp.public, p),
+            size,
+        )
+
+
+SUITES = {
+    "parameters": _parameter_cases,
+    "schnorr": _schnorr_cases,
+    "mpcith": _mpcith_cases,
+    "mq": _mq_cases,
+    "mqom": _mqom_cases,
+}
+
+
+def run(
+    grid: Grid, repeat: int, suites: Optional[List[str]] = None, log=None
+) -> dict:
+    results = []
+    for name in suites or list(SUITES):
+        for case in SUITES[name](grid):
+            row = {"name": case.name, "params": case.params}
+            row.update(measure(case.fn, repeat))
+            if case.sig_bytes is not None:
+                row["sig_bytes"] = case.sig_bytes
+            results.append(row)
+            if log is not None:
+                log(f"{_key(row):<70} {row['median_ms']:>10.2f} ms")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "jit": _kernels.ENABLED,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _key(row: dict) -> str:
+    args = ",".join(f"{k}={v}" for k, v in row["params"].items())
+    return f"{row['name']}[{args}]"
+
+
+def _log(line: str):
+    # 進捗は stderr へ (stdout は JSON の出力に使う)
+    print(line, file=sys.stderr)
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    metrics: Tuple[str, ...] = ("median_ms", "peak_kib"),
+) -> List[dict]:
+    """
+    両方に存在するケースについて 現在 / 基準 が threshold を超えた指標を返す
+    """
+    base = {_key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        old = base.get(_key(row))
+        if old is None:
+            continue
+        for metric in metrics:
+            before, after = old.get(metric), row.get(metric)
+            if not before or after is None:
+                continue
+            ratio = after / before
+            if ratio > threshold:
+                regressions.append(
+                    {
+                        "case": _key(row),
+                        "metric": metric,
+                        "baseline": before,
+                        "current": after,
+                        "ratio": ratio,
+                    }
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--full", action="store_true", help="大きいグリッド")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--suite", action="append", choices=sorted(SUITES), default=None
+    )
+    parser.add_argument("--out", help="結果を書き出す JSON ファイル")
+    parser.add_argument("--compare", help="基準とする結果の JSON ファイル")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    report = run(FULL if args.full else QUICK, args.repeat, args.suite, _log)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['case']} {r['metric']}: "
+                f"{r['baseline']:.2f} -> {r['current']:.2f} "
+                f"(x{r['ratio']:.2f})",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
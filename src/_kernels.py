@@ -0,0 +1,118 @@
+"""
+F_q (int64 で表せる小さい q) の縮約を numba でコンパイルしたカーネル。
+numba が無い場合や環境変数 MPCITH_DISABLE_JIT が設定されている場合は
+ENABLED が False となり、呼び出し側は NumPy の実装を使う。
+コンパイル結果は __pycache__ に保存され、次回以降の起動では読み込むだけでよい
+"""
+
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba は galois の依存
+    numba = None
+
+ENABLED = numba is not None and not os.environ.get("MPCITH_DISABLE_JIT")
+
+
+def _reduce_step(q: int, bound: int = 2**63 - 1) -> int:
+    # 積 (q-1)^2 を何回足すと int64 を溢れうるか
+    return max(1, (bound - (q - 1)) // ((q - 1) ** 2 or 1))
+
+
+def _matmul_mod(a, b, q, step):
+    # (r, k) @ (k, c) mod q。行ごとに積和を溜め、step 回ごとに簡約
+    r, k = a.shape
+    c = b.shape[1]
+    out = np.empty((r, c), dtype=np.int64)
+    acc = np.empty(c, dtype=np.int64)
+    for i in range(r):
+        acc[:] = 0
+        count = 0
+        for t in range(k):
+            ait = a[i, t]
+            if ait == 0:
+                continue
+            for j in range(c):
+                acc[j] += ait * b[t, j]
+            count += 1
+            if count == step:
+                for j in range(c):
+                    acc[j] %= q
+                count = 0
+        for j in range(c):
+            out[i, j] = acc[j] % q
+    return out
+
+
+def _quad_form_mod(A, xt, q, step):
+    # 各点 x_p (xt: (n, k) の列) の x_p A_i x_p^T mod q -> (m, k)。
+    # 最内側のループを点に沿わせてベクトル化する
+    m, n, _ = A.shape
+    k = xt.shape[1]
+    out = np.empty((m, k), dtype=np.int64)
+    row = np.empty(k, dtype=np.int64)
+    total = np.empty(k, dtype=np.int64)
+    for i in range(m):
+        total[:] = 0
+        for s in range(n):
+            row[:] = 0
+            count = 0
+            for t in range(n):
+                a = A[i, s, t]
+                if a == 0:
+                    continue
+                for p in range(k):
+                    row[p] += a * xt[t, p]
+                count += 1
+                if count == step:
+                    for p in range(k):
+                        row[p] %= q
+                    count = 0
+            for p in range(k):
+                total[p] = (total[p] + xt[s, p] * (row[p] % q)) % q
+        for p in range(k):
+            out[i, p] = total[p]
+    return out
+
+
+def _sum_mod(a, q):
+    # (r, c) の各列の和 mod q (シェアの総和)
+    r, c = a.shape
+    out = np.zeros(c, dtype=np.int64)
+    for i in range(r):
+        for j in range(c):
+            out[j] += a[i, j]
+            if out[j] >= q:
+                out[j] -= q
+    return out
+
+
+if ENABLED:
+    _matmul_mod = numba.njit(cache=True)(_matmul_mod)
+    _quad_form_mod = numba.njit(cache=True)(_quad_form_mod)
+    _sum_mod = numba.njit(cache=True)(_sum_mod)
+
+
+def matmul_mod(a: np.ndarray, b: np.ndarray, q: int) -> np.ndarray:
+    """a (..., k) @ b (k,) または (k, c) mod q (値は [0, q) の int64)"""
+    a2 = np.ascontiguousarray(a.reshape(-1, a.shape[-1]), dtype=np.int64)
+    b2 = np.ascontiguousarray(b.reshape(b.shape[0], -1), dtype=np.int64)
+    out = _matmul_mod(a2, b2, q, _reduce_step(q))
+    return out.reshape(a.shape[:-1] + b.shape[1:])
+
+
+def quad_form_mod(A: np.ndarray, xt: np.ndarray, q: int) -> np.ndarray:
+    """A (m, n, n), xt (n, k) -> x_p A_i x_p^T mod q を並べた (m, k)"""
+    A = np.ascontiguousarray(A, dtype=np.int64)
+    xt = np.ascontiguousarray(xt, dtype=np.int64)
+    return _quad_form_mod(A, xt, q, _reduce_step(q))
+
+
+def sum_mod(a: np.ndarray, q: int) -> np.ndarray:
+    """先頭の軸に沿った和 mod q (値は [0, q) の int64)"""
+    cols = int(np.prod(a.shape[1:]))
+    a2 = np.ascontiguousarray(a.reshape(a.shape[0], cols), dtype=np.int64)
+    return _sum_mod(a2, q).reshape(a.shape[1:])
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional, Sequence, Tuple, Union
 
-from .finite_field import Fq, FqN
+from .finite_field import Fq, FqArray, FqN, FqNArray
 from .mq_problem import MqProblem
 
 
@@ -21,10 +21,7 @@ class MQMPCParameter:
 
 
 def _dot_fq(row: List[Fq], x: List[Fq]) -> Fq:
-    acc = Fq(0, row[0].q)
-    for a, b in zip(row, x):
-        acc += a * b
-    return acc
+    return FqArray.from_list(row).dot(FqArray.from_list(x))
 
 
 def _mat_vec_fq(M: List[List[Fq]], x: List[Fq]) -> List[Fq]:
@@ -32,47 +29,64 @@ def _mat_vec_fq(M: List[List[Fq]], x: List[Fq]) -> List[Fq]:
     if len(M) != n or any(len(rc) != n for rc in M):
         raise ValueError("A_i must be an n * n matrix")
     q = x[0].q
-    result = [Fq(0, q) for _ in range(n)]
-    for r in range(n):
-        acc = Fq(0, q)
-        row = M[r]
-        for c in range(n):
-            acc += row[c] * x[c]
-        result[r] = acc
-    return result
+    return (FqArray.from_list(M, q) @ FqArray.from_list(x, q)).to_list()
 
 
-def compute_z_w(mq: MqProblem, param: MQMPCParameter):
+def linear_z_w(
+    mq: MqProblem, gamma: FqNArray, xs: FqArray
+) -> Tuple[FqNArray, FqNArray]:
     """
-    z = sum_{i=1}^m gamma_i * (y_i - b_i^T x), with gamma_i in F_{q^eta}
-    w = (sum_{i=1}^m gamma_i A_i) * x  in (F_{q^eta})^n
+    各点 x (xs: (k, n)) について -sum_i gamma_i b_i^T x と w = sum_i gamma_i A_i x。
+    どちらも x について線形なので x の加法的シェアにもそのまま適用できる
+    (z は前者に gamma . y を加えたもの)。
+    先に G = sum_i gamma_i A_i, g = sum_i gamma_i b_i を F_q 上の縮約で作り、
+    各点との積を F_q 上の行列積 1 回で行う
     """
-    x: List[Fq] = mq.x
-    y: List[Fq] = mq.y
-    A: List[List[List[Fq]]] = mq.A
-    b: List[List[Fq]] = mq.b
-
-    q, eta = param.q, param.eta
-    m, n = len(y), len(x)
-
-    if len(b) != m or len(A) != m:
-        raise ValueError("len(b) and len(A) must equal len(y)")
-    if any(len(row) != n for row in b):
-        raise ValueError("Each b[i] must have length len(x)")
+    q, n, m = mq.q, mq.n, mq.m
+    if gamma.shape != (m,) or gamma.p != q:
+        raise ValueError("gamma must be m elements of F_{q^eta}")
+    eta = gamma.n
+    g = FqArray(gamma.coeffs.T, q)  # (eta, m)
+    G = g @ FqArray(mq.A.values.reshape(m, n * n), q)  # (eta, n * n)
+    # G_cols[k, l * eta + t] = (G)_{l, k} の x^t の係数
+    G_cols = G.values.reshape(eta, n, n).transpose(2, 1, 0).reshape(n, n * eta)
+    gb = (g @ mq.b).values.T  # (n, eta)
+    xs2 = FqArray(xs.values.reshape(-1, n), q)  # (k, n)
+    w = xs2 @ FqArray(G_cols, q)  # (k, n * eta)
+    z = -(xs2 @ FqArray(gb, q))  # (k, eta)
+    k = xs2.shape[0]
+    return FqNArray(z.values, q, eta), FqNArray(
+        w.values.reshape(k, n, eta), q, eta
+    )
 
-    gamma = [FqN.random(q, eta) for _ in range(m)]
-    z = FqN.zero(q, eta)
-    w = [FqN.zero(q, eta) for _ in range(n)]
 
-    for i in range(m):
-        yi_minus_btx: Fq = y[i] - _dot_fq(b[i], x)
-        z = z + gamma[i] * FqN.embed(yi_minus_btx, eta)
+def z_w_arrays(mq: MqProblem, gamma: FqNArray) -> Tuple[FqN, FqNArray]:
+    """秘密 x についての z, w (z = gamma . (y - b x), w = sum gamma_i A_i x)"""
+    z, w = linear_z_w(mq, gamma, FqArray.from_list(mq.x, mq.q))
+    return gamma.dot(mq.y) + z[0], w[0]
 
-        u_i: List[Fq] = _mat_vec_fq(A[i], x)
-        for j in range(n):
-            w[j] = w[j] + gamma[i] * FqN.embed(u_i[j], eta)
 
-    return z, w
+def compute_z_w(
+    mq: MqProblem,
+    param: MQMPCParameter,
+    gamma: Optional[Union[FqNArray, Sequence[FqN]]] = None,
+):
+    """
+    z = sum_{i=1}^m gamma_i * (y_i - b_i^T x), with gamma_i in F_{q^eta}
+    w = (sum_{i=1}^m gamma_i A_i) * x  in (F_{q^eta})^n
+    gamma を省略すると一様に選ぶ
+    """
+    q, eta = param.q, param.eta
+    if q != mq.q:
+        raise ValueError("param.q must equal mq.q")
+    if gamma is None:
+        gamma = FqNArray.random(q, eta, mq.m)
+    elif not isinstance(gamma, FqNArray):
+        gamma = FqNArray.from_list(gamma)
+    if gamma.n != eta:
+        raise ValueError("gamma must lie in F_{q^eta}")
+    z, w = z_w_arrays(mq, gamma)
+    return z, w.to_list()
 
 
 def main():
@@ -1,8 +1,14 @@
+import hashlib
 import secrets
+from typing import Dict, Optional, Sequence, Tuple, Union
 
 import galois
+import numpy as np
+
+from . import _kernels, instrument
 
 _GALOIS_GF_CACHE = {}
+_REDUCTION_CACHE = {}
 
 
 def _get_gf(p: int, n: int):
@@ -14,30 +20,99 @@ def _get_gf(p: int, n: int):
     return gf
 
 
+def _get_reduction(p: int, n: int) -> np.ndarray:
+    """
+    x^k mod f(x) (0 <= k <= 2n-2) の係数を行に持つ (2n-1, n) 行列。
+    f は galois が F_{p^n} に用いる既約多項式。
+    """
+    key = (int(p), int(n))
+    red = _REDUCTION_CACHE.get(key)
+    if red is None:
+        # galois の係数は高次から並ぶ (モニック)
+        f = [int(c) for c in _get_gf(p, n).irreducible_poly.coeffs][::-1]
+        red = np.zeros((2 * n - 1, n), dtype=_dtype_for(p))
+        row = [0] * n
+        row[0] = 1
+        for k in range(2 * n - 1):
+            red[k] = row
+            # x^{k+1} = x * x^k, x^n = -(f_0 + ... + f_{n-1} x^{n-1})
+            top = row[-1]
+            row = [0] + row[:-1]
+            row = [(r - top * fi) % p for r, fi in zip(row, f[:n])]
+        _REDUCTION_CACHE[key] = red
+    return red
+
+
+class FieldContext:
+    """
+    F_q の法とそれに付随する定数。同じ q には同じインスタンスを使う (interning)
+    ので、元どうしの法の一致は is で確認できる。pickle しても同じ
+    インスタンスに戻る
+    """
+
+    __slots__ = ("q", "byte_len")
+
+    def __new__(cls, q: int):
+        ctx = _FIELD_CONTEXTS.get(q)
+        if ctx is None:
+            if q < 2:
+                raise ValueError("q must be a prime >= 2.")
+            ctx = super().__new__(cls)
+            ctx.q = int(q)
+            ctx.byte_len = (ctx.q.bit_length() + 7) // 8
+            ctx = _FIELD_CONTEXTS.setdefault(ctx.q, ctx)
+        return ctx
+
+    def __reduce__(self):
+        return (FieldContext, (self.q,))
+
+    def __repr__(self):
+        return f"FieldContext(q={self.q})"
+
+
+_FIELD_CONTEXTS: Dict[int, FieldContext] = {}
+
+
+def _field_context(q) -> FieldContext:
+    if type(q) is FieldContext:
+        return q
+    return _FIELD_CONTEXTS.get(q) or FieldContext(q)
+
+
 class Fq:
-    __slots__ = ("value", "q")
+    """q の代わりに共有の FieldContext を参照する (q はプロパティ)"""
+
+    __slots__ = ("value", "ctx")
+
+    def __init__(self, value: int, q: Union[int, FieldContext]):
+        if type(q) is not FieldContext:
+            q = _FIELD_CONTEXTS.get(q) or FieldContext(q)
+        self.ctx = q
+        self.value = value % q.q
 
-    def __init__(self, value: int, q: int):
-        if q < 2:
-            raise ValueError("q must be a prime >= 2.")
-        self.q = q
-        self.value = value % q
+    @property
+    def q(self) -> int:
+        return self.ctx.q
 
     def _check(self, other: "Fq"):
-        if not isinstance(other, Fq) or self.q != other.q:
+        if not isinstance(other, Fq) or self.ctx is not other.ctx:
             raise TypeError("Mismatched Fq modulus.")
 
+    # 頻出の演算では _check を呼ばずに法の一致 (is) を確認する
     def __add__(self, other: "Fq") -> "Fq":
-        self._check(other)
-        return Fq(self.value + other.value, self.q)
+        if type(other) is not Fq or other.ctx is not self.ctx:
+            self._check(other)
+        return Fq(self.value + other.value, self.ctx)
 
     def __sub__(self, other: "Fq") -> "Fq":
-        self._check(other)
-        return Fq(self.value - other.value, self.q)
+        if type(other) is not Fq or other.ctx is not self.ctx:
+            self._check(other)
+        return Fq(self.value - other.value, self.ctx)
 
     def __mul__(self, other: "Fq") -> "Fq":
-        self._check(other)
-        return Fq(self.value * other.value, self.q)
+        if type(other) is not Fq or other.ctx is not self.ctx:
+            self._check(other)
+        return Fq(self.value * other.value, self.ctx)
 
     def __truediv__(self, other: "Fq") -> "Fq":
         self._check(other)
@@ -45,30 +120,30 @@ class Fq:
 
     def __pow__(self, exp) -> "Fq":
         if isinstance(exp, Fq):
-            if exp.q != self.q:
+            if exp.ctx is not self.ctx:
                 raise TypeError("Exponent field mismatch.")
             e = exp.value
         elif isinstance(exp, int):
             e = exp
         else:
             raise TypeError("Exponent must be int or Fq.")
-        return Fq(pow(self.value, e, self.q), self.q)
+        return Fq(pow(self.value, e, self.ctx.q), self.ctx)
 
     def inv(self) -> "Fq":
-        return Fq(pow(self.value, -1, self.q), self.q)
+        return Fq(pow(self.value, -1, self.ctx.q), self.ctx)
 
     def __and__(self, other: "Fq") -> "Fq":
         self._check(other)
-        return Fq(self.value & other.value, self.q)
+        return Fq(self.value & other.value, self.ctx)
 
     def __or__(self, other: "Fq") -> "Fq":
         self._check(other)
-        return Fq(self.value | other.value, self.q)
+        return Fq(self.value | other.value, self.ctx)
 
     def __eq__(self, other) -> bool:
         return (
             isinstance(other, Fq)
-            and self.q == other.q
+            and self.ctx is other.ctx
             and self.value == other.value
         )
 
@@ -89,7 +164,7 @@ class Fq:
         return self.value >= other.value
 
     def __neg__(self) -> "Fq":
-        return Fq(-self.value, self.q)
+        return Fq(-self.value, self.ctx)
 
     def __str__(self):
         return f"{self.value}"
@@ -98,12 +173,260 @@ class Fq:
         return f"Fq({self.value} mod {self.q})"
 
     def to_bytes(self) -> bytes:
-        ln = (self.q.bit_length() + 7) // 8
-        return self.value.to_bytes(ln, "big")
+        return self.value.to_bytes(self.ctx.byte_len, "big")
+
+    @classmethod
+    def random(cls, q: Union[int, FieldContext]) -> "Fq":
+        ctx = _field_context(q)
+        return cls(secrets.randbelow(ctx.q), ctx)
+
+
+# (q-1)^2 が int64 に収まる最大の q (これを超える場合は object 配列で計算)
+_INT64_MAX_Q = 3037000499
+
+
+def _dtype_for(q: int):
+    return np.int64 if q <= _INT64_MAX_Q else object
+
+
+def _values_of(elements) -> list:
+    # Fq の (入れ子の) リストを int の (入れ子の) リストへ
+    if isinstance(elements, Fq):
+        return elements.value
+    return [_values_of(e) for e in elements]
+
+
+def _sample_below(
+    raw: bytes, q: int, limit: Optional[int] = None
+) -> np.ndarray:
+    """
+    乱数バイト列を区切り、棄却サンプリングで [0, q) の一様な値を取り出す
+    (limit 個集まった時点で打ち切る)
+    """
+    mask = (1 << q.bit_length()) - 1
+    if _dtype_for(q) is not object:
+        words = np.frombuffer(raw, dtype=">u8") & np.uint64(mask)
+        return words[words < np.uint64(q)][:limit].astype(np.int64)
+    ln = (q.bit_length() + 7) // 8
+    view = memoryview(raw)
+    values = []
+    for i in range(0, len(raw) - ln + 1, ln):
+        v = int.from_bytes(view[slice(i, i + ln)], "big") & mask
+        if v < q:
+            values.append(v)
+            if len(values) == limit:
+                break
+    return np.array(values, dtype=object)
+
+
+def _word_len(q: int) -> int:
+    # _sample_below が 1 候補に使うバイト数
+    return 8 if _dtype_for(q) is not object else (q.bit_length() + 7) // 8
+
+
+def _contract(a: np.ndarray, b: np.ndarray, q: int) -> np.ndarray:
+    """a @ b mod q (積和が int64 を溢れないよう必要なら縮約軸を分割して都度簡約)"""
+    k = a.shape[-1]
+    if a.dtype == object or k == 0:
+        return np.matmul(a, b) % q
+    if _kernels.ENABLED and b.ndim <= 2:
+        return _kernels.matmul_mod(a, b, q)
+    step = max(1, (2**63 - 1) // ((q - 1) ** 2 or 1))
+    if k <= step:
+        return np.matmul(a, b) % q
+    acc = None
+    for s in range(0, k, step):
+        window = slice(s, s + step)
+        # 縮約軸は b がベクトルなら先頭、行列 (の積み重ね) なら最後から 2 番目
+        b_part = b[window] if b.ndim == 1 else b[..., window, :]
+        part = np.matmul(a[..., window], b_part) % q
+        acc = part if acc is None else (acc + part) % q
+    return acc
+
+
+class FqArray:
+    """
+    F_q の元のベクトル・行列を 1 つの NumPy 配列で保持する。
+    法は Fq と同じく共有の FieldContext で持ち、一致は is で確認する
+    """
+
+    __slots__ = ("values", "ctx")
+
+    def __init__(self, values, q: Union[int, FieldContext]):
+        self.ctx = ctx = _field_context(q)
+        q = ctx.q
+        dtype = _dtype_for(q)
+        if isinstance(values, np.ndarray) and values.dtype == dtype:
+            self.values = values % q
+        else:
+            self.values = np.array(values, dtype=dtype) % q
+
+    @classmethod
+    def _wrap(
+        cls, values: np.ndarray, q: Union[int, FieldContext]
+    ) -> "FqArray":
+        # 既に [0, q) に簡約済みの配列をそのまま包む
+        obj = cls.__new__(cls)
+        obj.values = values
+        obj.ctx = q if type(q) is FieldContext else _field_context(q)
+        return obj
+
+    @property
+    def q(self) -> int:
+        return self.ctx.q
 
     @classmethod
-    def random(cls, q: int) -> "Fq":
-        return cls(secrets.randbelow(q), q)
+    def from_list(
+        cls, elements: Sequence, q: Optional[int] = None
+    ) -> "FqArray":
+        if q is None:
+            first = elements
+            while not isinstance(first, Fq):
+                first = first[0]
+            q = first.ctx
+        return cls(_values_of(elements), q)
+
+    @classmethod
+    def zeros(cls, q: int, shape: Union[int, Tuple[int, ...]]) -> "FqArray":
+        return cls._wrap(np.zeros(shape, dtype=_dtype_for(q)), q)
+
+    @classmethod
+    def random(cls, q: int, shape: Union[int, Tuple[int, ...]]) -> "FqArray":
+        size = int(np.prod(shape))
+        drawn = np.empty(0, dtype=_dtype_for(q))
+        while drawn.size < size:
+            need = size - drawn.size
+            raw = secrets.token_bytes(_word_len(q) * (2 * need + 8))
+            drawn = np.concatenate((drawn, _sample_below(raw, q)))
+        return cls._wrap(drawn[:size].reshape(shape), q)
+
+    @classmethod
+    def expand(
+        cls, seed: bytes, q: int, shape: Union[int, Tuple[int, ...]]
+    ) -> "FqArray":
+        """seed を SHAKE-256 で伸長し、棄却サンプリングで決定的に一様な元を得る"""
+        size = int(np.prod(shape))
+        length = _word_len(q) * (2 * size + 8)
+        instrument.count("hash_bytes", len(seed))
+        while True:
+            raw = hashlib.shake_256(seed).digest(length)
+            drawn = _sample_below(raw, q, size)
+            if drawn.size >= size:
+                return cls._wrap(drawn[:size].reshape(shape), q)
+            length *= 2
+
+    def to_list(self) -> list:
+        return _values_to_fq(self.values.tolist(), self.ctx)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.values.shape
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, key):
+        v = self.values[key]
+        if isinstance(v, np.ndarray):
+            return FqArray._wrap(v, self.ctx)
+        return Fq(int(v), self.ctx)
+
+    def __iter__(self):
+        for i in range(len(self.values)):
+            yield self[i]
+
+    def _coerce(self, other):
+        # 演算相手を配列 (またはスカラー) の値に揃える
+        if isinstance(other, FqArray):
+            if self.ctx is not other.ctx:
+                raise TypeError("Mismatched Fq modulus.")
+            return other.values
+        if isinstance(other, Fq):
+            if self.ctx is not other.ctx:
+                raise TypeError("Mismatched Fq modulus.")
+            return other.value
+        if isinstance(other, int):
+            return other % self.ctx.q
+        raise TypeError("Unsupported operand type for FqArray.")
+
+    def __add__(self, other) -> "FqArray":
+        return FqArray._wrap(
+            (self.values + self._coerce(other)) % self.ctx.q, self.ctx
+        )
+
+    __radd__ = __add__
+
+    def __sub__(self, other) -> "FqArray":
+        return FqArray._wrap(
+            (self.values - self._coerce(other)) % self.ctx.q, self.ctx
+        )
+
+    def __rsub__(self, other) -> "FqArray":
+        return FqArray._wrap(
+            (self._coerce(other) - self.values) % self.ctx.q, self.ctx
+        )
+
+    def __mul__(self, other) -> "FqArray":
+        return FqArray._wrap(
+            (self.values * self._coerce(other)) % self.ctx.q, self.ctx
+        )
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "FqArray":
+        return FqArray._wrap((-self.values) % self.ctx.q, self.ctx)
+
+    def __matmul__(self, other: "FqArray"):
+        if not isinstance(other, FqArray):
+            return NotImplemented
+        if self.ctx is not other.ctx:
+            raise TypeError("Mismatched Fq modulus.")
+        res = _contract(self.values, other.values, self.ctx.q)
+        if isinstance(res, np.ndarray) and res.ndim > 0:
+            return FqArray._wrap(res, self.ctx)
+        return Fq(int(res), self.ctx)
+
+    def dot(self, other: "FqArray") -> Fq:
+        if self.values.ndim != 1:
+            raise ValueError("dot expects 1-D arrays.")
+        return self @ other
+
+    def sum(self, axis: Optional[int] = None):
+        if axis is None:
+            flat = self.values.reshape(-1)
+            total = _contract(flat, np.ones_like(flat), self.q)
+            return Fq(int(total), self.ctx)
+        if _kernels.ENABLED and self.values.dtype != object:
+            moved = np.moveaxis(self.values, axis, 0)
+            return FqArray._wrap(_kernels.sum_mod(moved, self.q), self.ctx)
+        moved = np.moveaxis(self.values, axis, -1)
+        ones = np.ones(moved.shape[-1], dtype=moved.dtype)
+        return FqArray._wrap(_contract(moved, ones, self.q), self.ctx)
+
+    def append(self, element: Fq) -> "FqArray":
+        # 1 次元配列の末尾に元を 1 つ加える
+        if not isinstance(element, Fq) or element.ctx is not self.ctx:
+            raise TypeError("Mismatched Fq modulus.")
+        tail = np.array([element.value], dtype=self.values.dtype)
+        return FqArray._wrap(np.concatenate((self.values, tail)), self.ctx)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, FqArray)
+            and self.ctx is other.ctx
+            and self.values.shape == other.values.shape
+            and bool(np.all(self.values == other.values))
+        )
+
+    def __repr__(self):
+        return f"FqArray({self.values.tolist()} mod {self.q})"
+
+
+def _values_to_fq(values, q):
+    if isinstance(values, list):
+        ctx = _field_context(q)
+        return [_values_to_fq(v, ctx) for v in values]
+    return Fq(int(values), q)
 
 
 class FqN:
@@ -221,3 +544,225 @@ class FqN:
 
     def __str__(self):
         return f"{int(self._x)}"
+
+
+class FqNArray:
+    """
+    F_{q^n} の元のベクトルを係数行列 (..., n) にまとめて保持する。
+    基底は FqN (galois) と同じ多項式基底なので整数表現は共通。
+    """
+
+    __slots__ = ("coeffs", "p", "n")
+
+    def __init__(self, coeffs, p: int, n: int):
+        self.p = int(p)
+        self.n = int(n)
+        if self.p < 2 or self.n < 1:
+            raise ValueError("p >= 2 and n >= 1 required.")
+        c = np.array(coeffs, dtype=_dtype_for(self.p)) % self.p
+        if c.ndim == 0 or c.shape[-1] != self.n:
+            raise ValueError("coeffs must have shape (..., n).")
+        self.coeffs = c
+
+    @classmethod
+    def _wrap(cls, coeffs: np.ndarray, p: int, n: int) -> "FqNArray":
+        obj = cls.__new__(cls)
+        obj.coeffs = coeffs
+        obj.p = p
+        obj.n = n
+        return obj
+
+    @classmethod
+    def from_ints(cls, values, p: int, n: int) -> "FqNArray":
+        # 整数表現 (sum c_k p^k) -> 係数
+        v = np.array(values, dtype=object) % (p**n)
+        digits = []
+        for _ in range(n):
+            digits.append(v % p)
+            v = v // p
+        return cls(np.stack(digits, axis=-1).astype(_dtype_for(p)), p, n)
+
+    @classmethod
+    def from_list(cls, elements) -> "FqNArray":
+        first = elements[0]
+        return cls.from_ints([int(e._x) for e in elements], first.p, first.n)
+
+    # F_q^k -> F_{q^n}^k
+    @classmethod
+    def embed(cls, base, n: int) -> "FqNArray":
+        if not isinstance(base, FqArray):
+            if not all(isinstance(e, Fq) for e in base):
+                raise TypeError("embed expects an FqArray or a list of Fq.")
+            base = FqArray.from_list(base)
+        c = np.zeros(base.values.shape + (n,), dtype=base.values.dtype)
+        c[..., 0] = base.values
+        return cls._wrap(c, base.q, int(n))
+
+    @classmethod
+    def zeros(cls, p: int, n: int, shape) -> "FqNArray":
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        c = np.zeros(shape + (n,), dtype=_dtype_for(p))
+        return cls._wrap(c, int(p), int(n))
+
+    @classmethod
+    def random(cls, p: int, n: int, shape) -> "FqNArray":
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        return cls._wrap(FqArray.random(p, shape + (n,)).values, int(p), int(n))
+
+    def to_ints(self) -> np.ndarray:
+        weights = np.array([self.p**k for k in range(self.n)], dtype=object)
+        return self.coeffs.astype(object) @ weights
+
+    def to_list(self) -> list:
+        return [FqN(int(v), self.p, self.n) for v in self.to_ints().reshape(-1)]
+
+    @property
+    def shape(self):
+        return self.coeffs.shape[:-1]
+
+    def __len__(self) -> int:
+        return len(self.coeffs)
+
+    def __getitem__(self, key):
+        c = self.coeffs[key]
+        if c.ndim > 1:
+            return FqNArray._wrap(c, self.p, self.n)
+        return FqN([int(v) for v in c], self.p, self.n)
+
+    def __iter__(self):
+        for i in range(len(self.coeffs)):
+            yield self[i]
+
+    def _check(self, other):
+        if self.p != other.p or self.n != other.n:
+            raise TypeError("Mismatched FqN field parameters.")
+
+    def _coerce(self, other) -> np.ndarray:
+        # 加減算の相手を係数配列に揃える
+        if isinstance(other, FqNArray):
+            self._check(other)
+            return other.coeffs
+        if isinstance(other, FqN):
+            self._check(other)
+            return FqNArray.from_ints(int(other._x), self.p, self.n).coeffs
+        if isinstance(other, Fq):
+            other = FqArray._wrap(np.array(other.value), other.q)
+        if isinstance(other, FqArray):
+            if other.q != self.p:
+                raise TypeError("Base field mismatch.")
+            return FqNArray.embed(other, self.n).coeffs
+        raise TypeError("Unsupported operand type for FqNArray.")
+
+    def _reduce(self, prod: np.ndarray) -> np.ndarray:
+        # 次数 2n-2 以下の多項式 (..., 2n-1) を既約多項式で簡約
+        return _contract(prod % self.p, _get_reduction(self.p, self.n), self.p)
+
+    def _poly_mul(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        a, b = np.broadcast_arrays(a, b)
+        n = self.n
+        prod = np.zeros(a.shape[:-1] + (2 * n - 1,), dtype=a.dtype)
+        for i in range(n):
+            prod[..., slice(i, i + n)] += (a[..., i, None] * b) % self.p
+        return self._reduce(prod)
+
+    def __add__(self, other) -> "FqNArray":
+        c = (self.coeffs + self._coerce(other)) % self.p
+        return FqNArray._wrap(c, self.p, self.n)
+
+    __radd__ = __add__
+
+    def __sub__(self, other) -> "FqNArray":
+        c = (self.coeffs - self._coerce(other)) % self.p
+        return FqNArray._wrap(c, self.p, self.n)
+
+    def __rsub__(self, other) -> "FqNArray":
+        c = (self._coerce(other) - self.coeffs) % self.p
+        return FqNArray._wrap(c, self.p, self.n)
+
+    def __neg__(self) -> "FqNArray":
+        return FqNArray._wrap((-self.coeffs) % self.p, self.p, self.n)
+
+    def __mul__(self, other) -> "FqNArray":
+        if isinstance(other, Fq):
+            if other.q != self.p:
+                raise TypeError("Base field mismatch.")
+            other = other.value
+        if isinstance(other, int):
+            c = (self.coeffs * (other % self.p)) % self.p
+            return FqNArray._wrap(c, self.p, self.n)
+        if isinstance(other, FqArray):
+            if other.q != self.p:
+                raise TypeError("Base field mismatch.")
+            c = (self.coeffs * other.values[..., None]) % self.p
+            return FqNArray._wrap(c, self.p, self.n)
+        c = self._poly_mul(self.coeffs, self._coerce(other))
+        return FqNArray._wrap(c, self.p, self.n)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other) -> "FqNArray":
+        if isinstance(other, (Fq, int)):
+            v = other.value if isinstance(other, Fq) else other
+            return self * pow(v, -1, self.p)
+        if isinstance(other, FqN):
+            return self * other.inv()
+        if isinstance(other, FqNArray):
+            self._check(other)
+            return self * other.inv()
+        raise TypeError("Unsupported divisor type.")
+
+    def inv(self) -> "FqNArray":
+        gf = _get_gf(self.p, self.n)
+        x = gf(np.array(self.to_ints().reshape(-1).tolist(), dtype=object))
+        if np.any(x == 0):
+            raise ZeroDivisionError("inverse of zero")
+        inv = FqNArray.from_ints([int(v) for v in x**-1], self.p, self.n)
+        return FqNArray._wrap(
+            inv.coeffs.reshape(self.coeffs.shape), self.p, self.n
+        )
+
+    def __matmul__(self, other: "FqNArray"):
+        # (..., k) @ (k,) : 各行との内積
+        prod = FqNArray._wrap(self.coeffs, self.p, self.n) * other
+        return prod.sum(axis=-1)
+
+    def __rmatmul__(self, other: FqArray) -> "FqNArray":
+        # F_q 上の行列 (r, k) と F_{q^n}^k のベクトルの積
+        if not isinstance(other, FqArray) or other.q != self.p:
+            raise TypeError("Base field mismatch.")
+        c = _contract(other.values, self.coeffs, self.p)
+        if c.ndim > 1:
+            return FqNArray._wrap(c, self.p, self.n)
+        return FqN([int(v) for v in c], self.p, self.n)
+
+    def dot(self, other) -> "FqN":
+        if self.coeffs.ndim != 2:
+            raise ValueError("dot expects 1-D arrays.")
+        return (self * other).sum()
+
+    def sum(self, axis=None):
+        if axis is None:
+            flat = self.coeffs.reshape(-1, self.n)
+            c = FqArray._wrap(flat, self.p).sum(axis=0).values
+            return FqN([int(v) for v in c], self.p, self.n)
+        if axis < 0:
+            axis -= 1  # 最後の軸は係数
+        c = FqArray._wrap(self.coeffs, self.p).sum(axis=axis).values
+        if c.ndim > 1:
+            return FqNArray._wrap(c, self.p, self.n)
+        return FqN([int(v) for v in c], self.p, self.n)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, FqNArray)
+            and self.p == other.p
+            and self.n == other.n
+            and self.coeffs.shape == other.coeffs.shape
+            and bool(np.all(self.coeffs == other.coeffs))
+        )
+
+    def __repr__(self):
+        return (
+            f"FqNArray(p={self.p}, n={self.n}, "
+            f"values={self.to_ints().tolist()})"
+        )
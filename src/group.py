@@ -1,50 +1,118 @@
+import hashlib
+import json
+import multiprocessing
+import os
 import secrets
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from sympy import isprime, randprime
+import numpy as np
+from sympy import isprime, primerange
 
-from .finite_field import Fq
+from . import instrument
+from .finite_field import FieldContext, Fq
+
+
+def _to_exponent(exp, q: int) -> int:
+    if isinstance(exp, Fq):
+        if exp.q != q:
+            raise TypeError("Exponent Fq mismatch.")
+        return exp.value
+    if isinstance(exp, int):
+        return exp % q
+    raise TypeError("Exponent must be int or Fq.")
+
+
+class GroupContext:
+    """
+    群 (Z/pZ)^* の位数 q の部分群を表す (p, q) と符号長。
+    同じ (p, q) には同じインスタンスを使う (interning) ので、
+    元どうしの群の一致は is で確認できる。pickle しても同じインスタンスに戻る
+    """
+
+    __slots__ = ("p", "q", "p_len", "q_len", "field")
+
+    def __new__(cls, p: int, q: int):
+        ctx = _GROUP_CONTEXTS.get((p, q))
+        if ctx is None:
+            ctx = super().__new__(cls)
+            ctx.p = int(p)
+            ctx.q = int(q)
+            ctx.p_len = (ctx.p.bit_length() + 7) // 8
+            ctx.q_len = (ctx.q.bit_length() + 7) // 8
+            ctx.field = FieldContext(ctx.q)  # 指数の体
+            ctx = _GROUP_CONTEXTS.setdefault((ctx.p, ctx.q), ctx)
+        return ctx
+
+    def __reduce__(self):
+        return (GroupContext, (self.p, self.q))
+
+    def __repr__(self):
+        return f"GroupContext(p={self.p}, q={self.q})"
+
+
+_GROUP_CONTEXTS: Dict[Tuple[int, int], GroupContext] = {}
+
+
+def _group_context(p, q=None) -> GroupContext:
+    if type(p) is GroupContext:
+        return p
+    return _GROUP_CONTEXTS.get((p, q)) or GroupContext(p, q)  # type: ignore
 
 
 class GroupElement:
-    __slots__ = ("value", "p", "q")
+    """p, q の代わりに共有の GroupContext を参照する (p, q はプロパティ)"""
+
+    __slots__ = ("value", "ctx")
+
+    def __init__(
+        self,
+        value: int,
+        p: Union[int, GroupContext],
+        q: Optional[int] = None,
+    ):
+        if type(p) is not GroupContext:
+            p = _GROUP_CONTEXTS.get((p, q)) or GroupContext(p, q)
+        self.ctx = p
+        self.value = value % p.p
 
-    def __init__(self, value: int, p: int, q: int):
-        self.p = p
-        self.q = q
-        self.value = value % p
+    @property
+    def p(self) -> int:
+        return self.ctx.p
+
+    @property
+    def q(self) -> int:
+        return self.ctx.q
 
     def _check(self, other: "GroupElement"):
-        if (
-            not isinstance(other, GroupElement)
-            or self.p != other.p
-            or self.q != other.q
-        ):
+        if not isinstance(other, GroupElement) or self.ctx is not other.ctx:
             raise TypeError("Group mismatch.")
 
     def __mul__(self, other: "GroupElement") -> "GroupElement":
-        self._check(other)
-        return GroupElement((self.value * other.value) % self.p, self.p, self.q)
+        if type(other) is not GroupElement or other.ctx is not self.ctx:
+            self._check(other)
+        return GroupElement(self.value * other.value, self.ctx)
 
     def __pow__(self, exp) -> "GroupElement":
-        if isinstance(exp, Fq):
-            if exp.q != self.q:
-                raise TypeError("Exponent Fq mismatch.")
-            e = exp.value
-        elif isinstance(exp, int):
-            e = exp % self.q
-        else:
-            raise TypeError("Exponent must be int or Fq.")
-        return GroupElement(pow(self.value, e, self.p), self.p, self.q)
+        ctx = self.ctx
+        e = _to_exponent(exp, ctx.q)
+        instrument.count("exponentiations")
+        return GroupElement(pow(self.value, e, ctx.p), ctx)
 
     def __eq__(self, other) -> bool:
         return (
             isinstance(other, GroupElement)
-            and self.p == other.p
-            and self.q == other.q
+            and self.ctx is other.ctx
             and self.value == other.value
         )
 
+    def in_subgroup(self) -> bool:
+        """位数 q の部分群の元か (x^q == 1)。Z_p^* の位数 k の成分を持つ元は偽"""
+        ctx = self.ctx
+        instrument.count("exponentiations")
+        return self.value != 0 and pow(self.value, ctx.q, ctx.p) == 1
+
     def __str__(self):
         return f"{self.value}"
 
@@ -52,6 +120,228 @@ class GroupElement:
         return f"GroupElement({self.value} mod {self.p})"
 
 
+class GroupArray:
+    """同じ群の元の列を int のリストとして保持する"""
+
+    __slots__ = ("values", "ctx")
+
+    def __init__(
+        self,
+        values: Sequence[int],
+        p: Union[int, GroupContext],
+        q: Optional[int] = None,
+    ):
+        self.ctx = _group_context(p, q)
+        p = self.ctx.p
+        self.values = [v % p for v in values]
+
+    @classmethod
+    def _wrap(cls, values: List[int], ctx: GroupContext) -> "GroupArray":
+        # 既に [0, p) に簡約済みのリストをそのまま包む
+        obj = cls.__new__(cls)
+        obj.values = values
+        obj.ctx = ctx
+        return obj
+
+    @classmethod
+    def from_elements(cls, elements: Sequence[GroupElement]) -> "GroupArray":
+        if not elements:
+            raise ValueError("from_elements needs at least one element.")
+        first = elements[0]
+        for e in elements[1:]:
+            first._check(e)
+        return cls._wrap([e.value for e in elements], first.ctx)
+
+    @property
+    def p(self) -> int:
+        return self.ctx.p
+
+    @property
+    def q(self) -> int:
+        return self.ctx.q
+
+    def to_list(self) -> List[GroupElement]:
+        ctx = self.ctx
+        return [GroupElement(v, ctx) for v in self.values]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return GroupArray._wrap(self.values[key], self.ctx)
+        return GroupElement(self.values[key], self.ctx)
+
+    def __iter__(self):
+        ctx = self.ctx
+        for v in self.values:
+            yield GroupElement(v, ctx)
+
+    def product(self) -> GroupElement:
+        # 元を作らず int のまま掛け合わせる
+        p = self.ctx.p
+        instrument.count("group_multiplications", max(0, len(self.values) - 1))
+        acc = 1
+        for v in self.values:
+            acc = acc * v % p
+        return GroupElement(acc, self.ctx)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, GroupArray)
+            and self.ctx is other.ctx
+            and self.values == other.values
+        )
+
+    def __repr__(self):
+        return f"GroupArray({self.values} mod {self.p})"
+
+
+class FixedBaseTable:
+    """
+    固定底 base のべき乗表 (窓幅 window ビットの BGMW 方式)。
+    rows[i][d] = base^(d * 2^(window * i)) を保持し、
+    base^e は e の window ビットごとの桁で表を引いた積で求める。
+    """
+
+    __slots__ = ("base", "window", "_rows")
+
+    def __init__(self, base: GroupElement, window: int = 6):
+        if window < 1:
+            raise ValueError("window must be >= 1.")
+        self.base = base
+        self.window = window
+        p = base.p
+        n_rows = -(-base.q.bit_length() // window)
+        rows: List[List[int]] = []
+        b = base.value
+        for _ in range(n_rows):
+            row = [1]
+            for _ in range((1 << window) - 1):
+                row.append(row[-1] * b % p)
+            rows.append(row)
+            b = row[-1] * b % p  # base^(2^(window * (i+1)))
+        self._rows = rows
+
+    @property
+    def p(self) -> int:
+        return self.base.p
+
+    @property
+    def q(self) -> int:
+        return self.base.q
+
+    def pow_value(self, e: int) -> int:
+        # 0 <= e < q
+        p = self.base.p
+        mask = (1 << self.window) - 1
+        acc = 1
+        for row in self._rows:
+            d = e & mask
+            if d:
+                acc = acc * row[d] % p
+            e >>= self.window
+        return acc
+
+    def __pow__(self, exp) -> GroupElement:
+        e = _to_exponent(exp, self.q)
+        instrument.count("exponentiations")
+        return GroupElement(self.pow_value(e), self.base.ctx)
+
+    def pow_many(self, exps: Sequence[int]) -> GroupArray:
+        # 各 exps[i] (int) について base^exps[i] を表引きで求める
+        q = self.q
+        instrument.count("exponentiations", len(exps))
+        pow_value = self.pow_value
+        values = [pow_value(e % q) for e in exps]
+        return GroupArray._wrap(values, self.base.ctx)
+
+
+# 底の数がこれを超えたら Straus ではなく Pippenger を使う
+_PIPPENGER_THRESHOLD = 32
+
+
+def _straus(values: List[int], exps: List[int], p: int, window: int) -> int:
+    # 各底について base^d (0 <= d < 2^window) を用意し、上位桁から同時に処理
+    tables = []
+    for v in values:
+        row = [1]
+        for _ in range((1 << window) - 1):
+            row.append(row[-1] * v % p)
+        tables.append(row)
+    bits = max(e.bit_length() for e in exps)
+    mask = (1 << window) - 1
+    acc = 1
+    for shift in range((bits - 1) // window * window, -1, -window):
+        acc = pow(acc, 1 << window, p)
+        for row, e in zip(tables, exps):
+            d = (e >> shift) & mask
+            if d:
+                acc = acc * row[d] % p
+    return acc
+
+
+def _pippenger(values: List[int], exps: List[int], p: int) -> int:
+    # 窓ごとに桁の値でバケットへ振り分け、prod_d B_d^d を累積積で求める
+    window = max(2, len(values).bit_length() - 2)
+    bits = max(e.bit_length() for e in exps)
+    mask = (1 << window) - 1
+    acc = 1
+    for shift in range((bits - 1) // window * window, -1, -window):
+        acc = pow(acc, 1 << window, p)
+        buckets = [1] * (1 << window)
+        for v, e in zip(values, exps):
+            d = (e >> shift) & mask
+            if d:
+                buckets[d] = buckets[d] * v % p
+        running = 1
+        total = 1
+        for d in range(mask, 0, -1):
+            running = running * buckets[d] % p
+            total = total * running % p
+        acc = acc * total % p
+    return acc
+
+
+def multi_exp(bases: Sequence, exponents: Sequence) -> GroupElement:
+    """
+    prod_i bases[i]^exponents[i] を一度にまとめて計算する。
+    bases には GroupElement のほか FixedBaseTable も渡せる (表引きで計算)。
+    """
+    if len(bases) != len(exponents):
+        raise ValueError("bases and exponents must have the same length.")
+    if not bases:
+        raise ValueError("multi_exp needs at least one base.")
+    instrument.count("multi_exps")
+    elems = [b.base if isinstance(b, FixedBaseTable) else b for b in bases]
+    first = elems[0]
+    for b in elems[1:]:
+        first._check(b)
+    p, q = first.p, first.q
+
+    acc = 1
+    values: List[int] = []
+    exps: List[int] = []
+    for b, x in zip(bases, exponents):
+        e = _to_exponent(x, q)
+        if not e:
+            continue
+        if isinstance(b, FixedBaseTable):
+            acc = acc * b.pow_value(e) % p
+        else:
+            values.append(b.value)
+            exps.append(e)
+
+    if len(values) == 1:
+        acc = acc * pow(values[0], exps[0], p) % p
+    elif len(values) > _PIPPENGER_THRESHOLD:
+        acc = acc * _pippenger(values, exps, p) % p
+    elif values:
+        window = 5 if max(exps).bit_length() > 128 else 3
+        acc = acc * _straus(values, exps, p, window) % p
+    return GroupElement(acc, first.ctx)
+
+
 @dataclass(frozen=True)
 class Parameters:
     p: int
@@ -59,23 +349,283 @@ class Parameters:
     g: GroupElement
     p_len: int
     q_len: int
+    window: int = field(default=6, compare=False)
+    _g_table: Optional[FixedBaseTable] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def g_table(self) -> FixedBaseTable:
+        # 初回利用時に g のべき乗表を構築してキャッシュ
+        if self._g_table is None:
+            table = FixedBaseTable(self.g, self.window)
+            object.__setattr__(self, "_g_table", table)
+        return self._g_table  # type: ignore
+
+    def g_pow(self, exp) -> GroupElement:
+        return self.g_table**exp
+
+
+class _SeededRandom:
+    """seed を SHAKE-256 で伸長した決定的な乱数 (パラメータ生成用)"""
+
+    def __init__(self, seed: bytes):
+        self._seed = seed
+        self._counter = 0
+
+    def randbelow(self, n: int) -> int:
+        # [0, n) の一様な整数 (棄却サンプリング)
+        bits = n.bit_length()
+        n_bytes = (bits + 7) // 8
+        while True:
+            h = hashlib.shake_256(self._seed)
+            h.update(self._counter.to_bytes(8, "big"))
+            self._counter += 1
+            v = int.from_bytes(h.digest(n_bytes), "big") >> (8 * n_bytes - bits)
+            if v < n:
+                return v
+
+
+# 素数探索の篩: 窓内の候補を小さな素数で先に除く。
+# 素数判定は候補のビット長とともに重くなるため篩の上限も広げる
+_SIEVE_WINDOW = 512
+# 1 回の探索で調べる窓の数の上限 (範囲に素数が無いときに止まるため)
+_MAX_WINDOWS = 64
+_small_primes: List[int] = []
+
+
+def _sieve_bound(bits: int) -> int:
+    return min(1 << 16, max(1 << 10, bits * bits // 64))
+
+
+def _sieve(a: int, step: int, count: int) -> np.ndarray:
+    """a + step * j (0 <= j < count) のうち小さな素数で割り切れない j"""
+    bound = _sieve_bound(a.bit_length())
+    if not _small_primes or _small_primes[-1] < bound:
+        _small_primes[:] = [int(r) for r in primerange(3, 2 * bound)]
+    alive = np.ones(count, dtype=bool)
+    for r in _small_primes:
+        if r >= bound or r >= a:
+            break  # r >= a なら候補が r 自身でありうる
+        s = step % r
+        if s == 0:
+            if a % r == 0:
+                return np.empty(0, dtype=np.int64)
+            continue
+        alive[slice((-a * pow(s, -1, r)) % r, None, r)] = False
+    return np.flatnonzero(alive)
+
 
+def _first_prime(candidates: List[int]) -> Optional[int]:
+    for n in candidates:
+        if isprime(n):
+            return n
+    return None
 
-def generate_parameters(q_bits: int = 256, max_k: int = 2**32) -> Parameters:
+
+def _search_prime(
+    step: int,
+    t_lo: int,
+    t_hi: int,
+    randbelow: Callable[[int], int],
+    pool: Optional[ProcessPoolExecutor] = None,
+    workers: int = 1,
+) -> Optional[int]:
+    """
+    1 + step * t (t_lo <= t <= t_hi) の形の素数を探す。
+    ランダムな t から始まる窓を篩い、残った候補を順に素数判定する
+    (pool があれば候補を分けて並列に判定し、最初の素数を採る)。
+    範囲が窓に収まれば全体を 1 度だけ調べ、そうでなければ _MAX_WINDOWS 個の
+    窓を調べる。見つからなければ None を返す
+    """
+    span = t_hi - t_lo + 1
+    if span <= _SIEVE_WINDOW:
+        # 範囲全体を篩い、ランダムな位置から巡回して判定する
+        a = 1 + step * t_lo
+        alive = _sieve(a, step, span)
+        start = randbelow(span)
+        order = np.concatenate((alive[alive >= start], alive[alive < start]))
+        return _find_prime([a + step * int(j) for j in order], pool, workers)
+    for _ in range(_MAX_WINDOWS):
+        t0 = t_lo + randbelow(span)
+        a = 1 + step * t0
+        count = min(_SIEVE_WINDOW, t_hi - t0 + 1)
+        candidates = [a + step * int(j) for j in _sieve(a, step, count)]
+        found = _find_prime(candidates, pool, workers)
+        if found is not None:
+            return found
+    return None
+
+
+def _find_prime(
+    candidates: List[int],
+    pool: Optional[ProcessPoolExecutor],
+    workers: int,
+) -> Optional[int]:
+    if pool is None:
+        return _first_prime(candidates)
+    size = max(1, len(candidates) // (4 * workers))
+    chunks = [
+        candidates[slice(i, i + size)] for i in range(0, len(candidates), size)
+    ]
+    return next(
+        (n for n in pool.map(_first_prime, chunks) if n is not None), None
+    )
+
+
+def generate_parameters(
+    q_bits: int = 256,
+    max_k: int = 2**32,
+    window: int = 6,
+    seed: Optional[bytes] = None,
+    p_bits: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Parameters:
+    """
+    p = k * q + 1 (p, q は素数) と位数 q の生成元 g を求める。
+    seed を渡すと同じ seed から常に同じパラメータを生成する。
+    p_bits を渡すと p をちょうど p_bits ビットにする (省略時は k <= max_k + 1)。
+    workers > 1 なら素数判定をプロセス並列で行う (結果は逐次と同じ)
+    """
     if q_bits < 8:
         raise ValueError("q_bits should be >= 8.")
-    q = int(randprime(2 ** (q_bits - 1), 2**q_bits))  # type: ignore
-    while True:
-        k = secrets.randbelow(max_k) + 2
-        p = k * q + 1
-        if isprime(p):
-            break
+    if p_bits is not None and p_bits < q_bits + 2:
+        raise ValueError("p_bits should be >= q_bits + 2.")
+    randbelow = (
+        secrets.randbelow if seed is None else _SeededRandom(seed).randbelow
+    )
+    workers = workers or 1
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    try:
+        p = None
+        while p is None:
+            # q は [2^(q_bits-1), 2^q_bits) の奇数 1 + 2t
+            q = _search_prime(
+                2,
+                2 ** (q_bits - 2),
+                2 ** (q_bits - 1) - 1,
+                randbelow,
+                pool,
+                workers,
+            )
+            if q is None:
+                continue
+            # p = 1 + 2q * t (k = 2t は偶数)。
+            # 範囲に素数が無ければ (p_bits が q_bits に近いとき) q を選び直す
+            if p_bits is None:
+                t_lo, t_hi = 1, (max_k + 1) // 2
+            else:
+                t_lo = -(-(2 ** (p_bits - 1) - 1) // (2 * q))
+                t_hi = (2**p_bits - 2) // (2 * q)
+            p = _search_prime(2 * q, t_lo, t_hi, randbelow, pool, workers)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    k = (p - 1) // q
     while True:
-        a = secrets.randbelow(p - 3) + 2
+        a = randbelow(p - 3) + 2
         g_val = pow(a, k, p)
         if g_val != 1:
-            g = GroupElement(g_val, p, q)
             break
+    return _make_parameters(p, q, g_val, window)
+
+
+def _make_parameters(p: int, q: int, g: int, window: int) -> Parameters:
     p_len = (p.bit_length() + 7) // 8
     q_len = (q.bit_length() + 7) // 8
-    return Parameters(p=p, q=q, g=g, p_len=p_len, q_len=q_len)
+    return Parameters(
+        p=p,
+        q=q,
+        g=GroupElement(g, p, q),
+        p_len=p_len,
+        q_len=q_len,
+        window=window,
+    )
+
+
+def validate_parameters(params: Parameters):
+    """p, q が素数で q | p - 1、g が位数 q の元であることを確認する"""
+    p, q, g = params.p, params.q, params.g.value
+    if not isprime(q) or not isprime(p):
+        raise ValueError("p and q must be prime.")
+    if (p - 1) % q:
+        raise ValueError("q must divide p - 1.")
+    if (params.g.p, params.g.q) != (p, q):
+        raise ValueError("g must belong to the group (p, q).")
+    if not 1 < g < p or pow(g, q, p) != 1:
+        raise ValueError("g must generate the subgroup of order q.")
+    if (
+        params.p_len != (p.bit_length() + 7) // 8
+        or params.q_len != (q.bit_length() + 7) // 8
+    ):
+        raise ValueError("p_len / q_len do not match p / q.")
+
+
+def save_parameters(
+    params: Parameters, path: str, seed: Optional[bytes] = None
+):
+    """seed を渡すと生成に用いた seed も記録する (get_parameters が照合する)"""
+    data = {"p": params.p, "q": params.q, "g": params.g.value}
+    data["window"] = params.window
+    if seed is not None:
+        data["seed"] = seed.hex()
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def _read_parameter_file(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_parameters(path: str, validate: bool = True) -> Parameters:
+    """save_parameters で保存したパラメータを読み込む (既定で検証する)"""
+    data = _read_parameter_file(path)
+    try:
+        params = _make_parameters(
+            int(data["p"]), int(data["q"]), int(data["g"]), int(data["window"])
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"malformed parameter file: {path}") from e
+    if validate:
+        validate_parameters(params)
+    return params
+
+
+# get_parameters が生成・読み込みしたパラメータ ((q_bits, seed) ごと)
+_REGISTRY: Dict[Tuple[int, Optional[bytes]], Parameters] = {}
+
+
+def get_parameters(
+    q_bits: int = 256,
+    seed: Optional[bytes] = None,
+    path: Optional[str] = None,
+) -> Parameters:
+    """
+    プロセス内で (q_bits, seed) ごとにパラメータを使い回す。
+    path を渡すと、ファイルがあれば読み込んで検証し、なければ生成して保存する
+    (seed を共有すれば別のプロセス・マシンでも同じパラメータになる)。
+    seed を渡した場合、ファイルに記録された seed と異なれば ValueError
+    """
+    key = (q_bits, seed)
+    params = _REGISTRY.get(key)
+    if params is not None:
+        return params
+    if path is not None and os.path.exists(path):
+        params = load_parameters(path)
+        if params.q.bit_length() != q_bits:
+            raise ValueError(f"{path} holds parameters for another q_bits.")
+        stored = _read_parameter_file(path).get("seed")
+        if seed is not None and stored != seed.hex():
+            raise ValueError(f"{path} holds parameters for another seed.")
+    else:
+        params = generate_parameters(q_bits=q_bits, seed=seed)
+        if path is not None:
+            save_parameters(params, path, seed)
+    _REGISTRY[key] = params
+    return params
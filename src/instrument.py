@@ -0,0 +1,141 @@
+"""
+署名・検証の段階ごとの所要時間とカウンタの記録 (任意)
+
+    with instrument.recording() as rec:
+        sign(...)
+    rec.to_dict()  # {"stages": {...}, "counters": {...}}
+
+記録していなければ stage() は共有の空のコンテキストを返し、count() は
+記録の有無を確認するだけで戻る。要素ごとに数える量 (Fq の生成、
+GroupElement の乗算) は記録中に限りメソッドを差し替えて数えるため、
+無効時の負担はない。記録は recording() を呼んだスレッドの処理のみが対象
+(Presigner の補充スレッドや executor="process" のワーカーでの処理は含まれない)。
+
+カウンタ:
+    exponentiations: べき乗 (表引き・組み込み pow)
+    multi_exps: multi_exp の呼び出し
+    group_multiplications: 群の乗算 (multi_exp 内部を除く)
+    hash_bytes: トランスクリプト・コミットメント・シード木で
+        ハッシュに取り込んだバイト数
+    fq_allocations: Fq の生成
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class Recorder:
+    """段階ごとの所要時間 [秒]・呼び出し回数とカウンタを集計する"""
+
+    __slots__ = ("seconds", "calls", "counters")
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def to_dict(self) -> dict:
+        stages = {
+            name: {"seconds": self.seconds[name], "calls": self.calls[name]}
+            for name in self.seconds
+        }
+        return {"stages": stages, "counters": dict(self.counters)}
+
+
+_active: Optional[Recorder] = None
+_owner: Optional[int] = None  # 記録しているスレッドの識別子
+
+
+class _Stage:
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder: Recorder, name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.seconds[self.name] += time.perf_counter() - self.start
+        self.recorder.calls[self.name] += 1
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """with stage("sign.commitments"): ... の区間の時間を記録する"""
+    recorder = _active
+    if recorder is None or threading.get_ident() != _owner:
+        return _NULL_STAGE
+    return _Stage(recorder, name)
+
+
+def count(name: str, n: int = 1):
+    recorder = _active
+    if recorder is not None and threading.get_ident() == _owner:
+        recorder.counters[name] += n
+
+
+def _install():
+    # 要素ごとのカウンタ用にメソッドを差し替え、元に戻す関数を返す
+    from .finite_field import Fq
+    from .group import GroupElement
+
+    fq_init = Fq.__init__
+    group_mul = GroupElement.__mul__
+
+    def counted_init(self, value, q):
+        count("fq_allocations")
+        fq_init(self, value, q)
+
+    def counted_mul(self, other):
+        count("group_multiplications")
+        return group_mul(self, other)
+
+    Fq.__init__ = counted_init  # type: ignore[method-assign]
+    GroupElement.__mul__ = counted_mul  # type: ignore[method-assign]
+
+    def restore():
+        Fq.__init__ = fq_init  # type: ignore[method-assign]
+        GroupElement.__mul__ = group_mul  # type: ignore[method-assign]
+
+    return restore
+
+
+@contextmanager
+def recording(recorder: Optional[Recorder] = None) -> Iterator[Recorder]:
+    """
+    区間内に呼び出し元のスレッドで行った処理を recorder (省略時は新しい
+    Recorder) に記録する。同じ recorder を渡せば複数の区間を合算できる
+    (入れ子や複数のスレッドからの同時の記録は不可)
+    """
+    global _active, _owner
+    if _active is not None:
+        raise RuntimeError("instrument.recording() is already active.")
+    recorder = Recorder() if recorder is None else recorder
+    restore = _install()
+    _owner = threading.get_ident()
+    _active = recorder
+    try:
+        yield recorder
+    finally:
+        _active = None
+        _owner = None
+        restore()
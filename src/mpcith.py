@@ -1,11 +1,51 @@
 import hashlib
+import multiprocessing
+import os
+import secrets
+import struct
+import threading
+from collections.abc import Sequence as SequenceABC
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Tuple
-
-from .finite_field import Fq
-from .group import GroupElement, Parameters, generate_parameters
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from . import instrument
+from .finite_field import Fq, FqArray
+from .group import (
+    GroupArray,
+    GroupElement,
+    Parameters,
+    generate_parameters,
+    multi_exp,
+)
 from .schnorr_fs import encode_message, int_to_bytes
 from .secret_sharing import FieldShare
+from .seed_tree import SEED_LEN, SeedTree, tree_depth
+
+SALT_LEN = 32
+DIGEST_LEN = 32  # SHA-256
+MODES = ("standard", "hypercube")
+EXECUTORS = (None, "process")
+# verify_signature_detailed が確認する段階 (安い順)
+STAGES = ("structure", "challenge", "product", "commitment", "share")
+
+# バイナリ形式: ヘッダ (版, N, M, 1 ラウンドの群シェア数) + salt + challenge_seed
+WIRE_VERSION = 1
+_HEADER = struct.Struct(">BHHH")
+_PREFIX_LEN = _HEADER.size + SALT_LEN + DIGEST_LEN
+
+# executor="process" のプロセスプール、およびワーカー側で共有するパラメータ
+_pools: Dict[Tuple[int, int, int, int], ProcessPoolExecutor] = {}
+_worker_params: Optional[Parameters] = None
 
 
 @dataclass(frozen=True)
@@ -21,7 +61,8 @@ class MPCitHProof:
     commits: List[int]
     group_shares: List[GroupElement]
     hidden_party: int
-    opened_party: List[Tuple[int, Fq]]  # (index, share)
+    seed_path: List[bytes]  # 隠すパーティ以外の葉シードを復元する兄弟シード
+    aux_share: Optional[Fq]  # 最後のパーティのシェア (隠す場合は None)
 
 
 @dataclass(frozen=True)
@@ -30,15 +71,240 @@ class WholeSignature:
 
     proofs: List[MPCitHProof]
     challenge_seed: bytes
+    salt: bytes
+
+    def to_bytes(self, params: Parameters) -> bytes:
+        """
+        固定長のバイナリ形式に変換する。各ラウンドは
+        hidden_party (2) | commits (N * q_len) | group_shares (K * p_len) |
+        seed_path (log2 N * SEED_LEN) | aux_share (q_len, 隠す場合は 0)
+        """
+        m = len(self.proofs)
+        if m == 0:
+            raise ValueError("signature has no proofs.")
+        if len(self.salt) != SALT_LEN or len(self.challenge_seed) != DIGEST_LEN:
+            raise ValueError("salt or challenge_seed has the wrong length.")
+        n = len(self.proofs[0].commits)
+        k = len(self.proofs[0].group_shares)
+        depth = tree_depth(n)
+        parts = [_HEADER.pack(WIRE_VERSION, n, m, k), self.salt]
+        parts.append(self.challenge_seed)
+        for proof in self.proofs:
+            if (
+                len(proof.commits) != n
+                or len(proof.group_shares) != k
+                or len(proof.seed_path) != depth
+            ):
+                raise ValueError("all proofs must have the same shape.")
+            parts.append(proof.hidden_party.to_bytes(2, "big"))
+            parts.extend(int_to_bytes(c, params.q_len) for c in proof.commits)
+            parts.extend(
+                int_to_bytes(g.value, params.p_len) for g in proof.group_shares
+            )
+            parts.extend(proof.seed_path)
+            aux = 0 if proof.aux_share is None else proof.aux_share.value
+            parts.append(int_to_bytes(aux, params.q_len))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, params: Parameters) -> "WholeSignature":
+        return SignatureView(data, params).to_signature()
+
+
+@dataclass
+class VerificationWork:
+    """検証で費やした処理量"""
+
+    hashed_rounds: int = 0  # トランスクリプトに取り込んだラウンド数
+    commitments: int = 0  # 再計算したコミットメントの数
+    exponentiations: int = 0  # g のべき乗の回数
+    multi_exps: int = 0  # まとめて確認した multi_exp の回数
+
+
+@dataclass(frozen=True)
+class VerificationResult:
+    """
+    検証結果。失敗時は stage に失敗した段階 (STAGES のいずれか)、
+    round_index にそのラウンドを持つ (ラウンドによらない失敗は None)
+    """
+
+    ok: bool
+    work: VerificationWork
+    stage: Optional[str] = None
+    round_index: Optional[int] = None
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+class _LazyProofs(SequenceABC):
+    # SignatureView のラウンドを参照時に 1 つずつ復元する
+    def __init__(self, view: "SignatureView"):
+        self._view = view
+
+    def __len__(self) -> int:
+        return self._view.m
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [
+                self._view.proof(j) for j in range(*i.indices(self._view.m))
+            ]
+        if not -self._view.m <= i < self._view.m:
+            raise IndexError("round index out of range.")
+        return self._view.proof(i % self._view.m)
+
+
+class SignatureView:
+    """
+    to_bytes の出力を memoryview で参照し、要求された要素だけを復元する。
+    proofs は遅延評価の列なので WholeSignature の代わりに検証へ渡せる。
+    """
+
+    def __init__(self, data: bytes, params: Parameters):
+        buf = memoryview(data)
+        if len(buf) < _PREFIX_LEN:
+            raise ValueError("signature too short.")
+        version, n, m, k = _HEADER.unpack_from(buf)
+        if version != WIRE_VERSION:
+            raise ValueError(f"unsupported signature version {version}.")
+        if n < 2 or m < 1:
+            raise ValueError("invalid signature header.")
+        self.params = params
+        self.n = n
+        self.m = m
+        self.k = k
+        self._depth = tree_depth(n)
+        self._commits_at = 2
+        self._shares_at = self._commits_at + n * params.q_len
+        self._path_at = self._shares_at + k * params.p_len
+        self._aux_at = self._path_at + self._depth * SEED_LEN
+        self.round_len = self._aux_at + params.q_len
+        if len(buf) != _PREFIX_LEN + m * self.round_len:
+            raise ValueError("signature length mismatch.")
+        self._buf = buf
+        self.salt = bytes(buf[slice(_HEADER.size, _HEADER.size + SALT_LEN)])
+        self.challenge_seed = bytes(
+            buf[slice(_HEADER.size + SALT_LEN, _PREFIX_LEN)]
+        )
+
+    @property
+    def proofs(self) -> _LazyProofs:
+        return _LazyProofs(self)
+
+    def _field(self, i: int, at: int, length: int) -> memoryview:
+        # ラウンド i の先頭から at バイト目以降 length バイト
+        start = _PREFIX_LEN + i * self.round_len + at
+        return self._buf[slice(start, start + length)]
+
+    def round_bytes(self, i: int) -> memoryview:
+        return self._field(i, 0, self.round_len)
+
+    def transcript_bytes(self, i: int) -> memoryview:
+        # コミットメントと群シェアは Transcript.encode_round と同じ並び
+        return self._field(
+            i, self._commits_at, self._path_at - self._commits_at
+        )
+
+    def hidden_party(self, i: int) -> int:
+        return int.from_bytes(self._field(i, 0, 2), "big")
+
+    def commit(self, i: int, j: int) -> int:
+        ln = self.params.q_len
+        return int.from_bytes(
+            self._field(i, self._commits_at + j * ln, ln), "big"
+        )
+
+    def _raw_share(self, i: int, j: int) -> int:
+        ln = self.params.p_len
+        raw = self._field(i, self._shares_at + j * ln, ln)
+        return int.from_bytes(raw, "big")
+
+    def group_share(self, i: int, j: int) -> GroupElement:
+        return GroupElement(self._raw_share(i, j), self.params.g.ctx)
+
+    def seed_path(self, i: int) -> List[bytes]:
+        return [
+            bytes(self._field(i, at, SEED_LEN))
+            for at in range(self._path_at, self._aux_at, SEED_LEN)
+        ]
+
+    def aux_share(self, i: int) -> Optional[Fq]:
+        if self.hidden_party(i) == self.n - 1:
+            return None
+        raw = self._field(i, self._aux_at, self.params.q_len)
+        return Fq(int.from_bytes(raw, "big"), self.params.q)
+
+    def proof(self, i: int) -> MPCitHProof:
+        return MPCitHProof(
+            commits=[self.commit(i, j) for j in range(self.n)],
+            group_shares=[self.group_share(i, j) for j in range(self.k)],
+            hidden_party=self.hidden_party(i),
+            seed_path=self.seed_path(i),
+            aux_share=self.aux_share(i),
+        )
+
+    def canonical(self, i: int) -> bool:
+        """
+        ラウンド i の各値が法未満で符号化されているか。
+        トランスクリプトは生のバイト列を取り込むため、復元時の剰余で
+        同じ値になる別の符号化を受け付けないようにする
+        """
+        q, p = self.params.q, self.params.p
+        if any(self.commit(i, j) >= q for j in range(self.n)):
+            return False
+        if any(not 0 < self._raw_share(i, j) < p for j in range(self.k)):
+            return False
+        raw = self._field(i, self._aux_at, self.params.q_len)
+        aux = int.from_bytes(raw, "big")
+        if self.hidden_party(i) == self.n - 1:
+            return aux == 0
+        return aux < q
+
+    def to_signature(self) -> WholeSignature:
+        """
+        WholeSignature に復元する。
+        法以上の値など正規でない符号化を含むラウンドがあれば ValueError
+        """
+        for i in range(self.m):
+            if not self.canonical(i):
+                raise ValueError(f"non-canonical encoding in round {i}.")
+        return WholeSignature(
+            proofs=list(self.proofs),
+            challenge_seed=self.challenge_seed,
+            salt=self.salt,
+        )
 
 
 def commitment(field_share: Fq, q_len: int) -> int:
+    instrument.count("hash_bytes", q_len)
     h = hashlib.sha256()
     h.update(int_to_bytes(field_share.value, q_len))
     digest = h.digest()
     return int.from_bytes(digest, "big") % field_share.q
 
 
+def leaf_share(leaf_seed: bytes, q: int) -> Fq:
+    # 葉シードからパーティのシェアを導出
+    return FqArray.expand(leaf_seed, q, 1)[0]
+
+
+def _check_mode(mode: str, n: int):
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}.")
+    if mode == "hypercube" and (n < 2 or n & (n - 1)):
+        raise ValueError("hypercube mode requires n to be a power of two.")
+
+
+def main_party_share(shares: List[Fq], dim: int, bit: int) -> Fq:
+    """
+    ハイパーキューブの主パーティのシェア:
+    インデックスの第 dim ビットが bit である葉パーティのシェアの和
+    """
+    selected = [s for i, s in enumerate(shares) if (i >> dim) & 1 == bit]
+    return FqArray.from_list(selected, shares[0].q).sum()
+
+
 def generate_challenges(seed_data: bytes, m: int, n: int) -> List[int]:
     # ハッシュ値からm個のチャレンジ（隠すパーティのインデックス）を生成
     shake = hashlib.shake_256()
@@ -47,147 +313,619 @@ def generate_challenges(seed_data: bytes, m: int, n: int) -> List[int]:
     return [b % n for b in random_bytes]  # TODO: modulo bias
 
 
-def verify_signature(
-    sig: WholeSignature, message: bytes, params: Parameters, y: GroupElement
-) -> bool:
-    m = len(sig.proofs)
-    if m == 0:
-        return False
+def encode_round(
+    params: Parameters, commits: List[int], group_shares: List[GroupElement]
+) -> bytes:
+    """1 ラウンド分のトランスクリプトのバイト列 (コミットメント, 群シェアの順)"""
+    # join は全体の長さを先に求めて 1 度だけ確保する
+    q_len, p_len = params.q_len, params.p_len
+    return b"".join(
+        [c.to_bytes(q_len, "big") for c in commits]
+        + [g.value.to_bytes(p_len, "big") for g in group_shares]
+    )
 
-    h = hashlib.sha256()
-    h.update(encode_message(message))
 
-    for proof in sig.proofs:
-        for c in proof.commits:
-            h.update(int_to_bytes(c, params.q_len))
-        for g_elem in proof.group_shares:
-            h.update(int_to_bytes(g_elem.value, params.p_len))
+class Transcript:
+    """
+    Fiat-Shamir のトランスクリプト (SHA-256)。
+    ラウンドごとにコミットメントと群シェアを 1 つのバッファへ並べ、
+    1 回の update で取り込む (署名・検証で共通)。
+    メッセージは digest で最後に取り込むので、ラウンドは署名対象が
+    決まる前 (presign) から生成順に取り込める
+    """
 
-    digest = h.digest()
+    def __init__(self, params: Parameters, mode: str, salt: bytes):
+        self.params = params
+        self._h = hashlib.sha256()
+        self.absorb_encoded(mode.encode())
+        self.absorb_encoded(salt)
 
-    n = len(sig.proofs[0].commits)
-    recomputed_challenges = generate_challenges(digest, m, n)
+    def encode_round(
+        self, commits: List[int], group_shares: List[GroupElement]
+    ) -> bytes:
+        return encode_round(self.params, commits, group_shares)
 
-    for i, proof in enumerate(sig.proofs):
-        if proof.hidden_party != recomputed_challenges[i]:
-            print(f"Round {i}: Challenge mismatch")
-            return False
+    def absorb_round(
+        self, commits: List[int], group_shares: List[GroupElement]
+    ):
+        self.absorb_encoded(self.encode_round(commits, group_shares))
 
-        if not verify_single_round(proof, params, y):
-            print(f"Round {i}: Single proof verification failed")
-            return False
+    def absorb_encoded(self, data):
+        # encode_round 済み (またはバイナリ形式から切り出した) バイト列
+        instrument.count("hash_bytes", len(data))
+        self._h.update(data)
 
-    return True
+    def digest(self, message: bytes) -> bytes:
+        """message を取り込んだダイジェスト (取り込み前の状態は変えない)"""
+        data = encode_message(message)
+        instrument.count("hash_bytes", len(data))
+        h = self._h.copy()
+        h.update(data)
+        return h.digest()
 
 
-def verify_single_round(
-    proof: MPCitHProof, params: Parameters, y: GroupElement
+def verify_signature(
+    sig: WholeSignature,
+    message: bytes,
+    params: Parameters,
+    y: GroupElement,
+    mode: str = "standard",
+    executor: Optional[str] = None,
+    workers: Optional[int] = None,
+    batch: bool = False,
 ) -> bool:
-    n = len(proof.commits)
+    """verify_signature_detailed の結果を真偽値で返す"""
+    return verify_signature_detailed(
+        sig, message, params, y, mode, executor, workers, batch
+    ).ok
+
+
+def verify_signature_detailed(
+    sig: WholeSignature,
+    message: bytes,
+    params: Parameters,
+    y: GroupElement,
+    mode: str = "standard",
+    executor: Optional[str] = None,
+    workers: Optional[int] = None,
+    batch: bool = False,
+) -> VerificationResult:
+    """
+    安い確認から順に全ラウンドへ適用し、最初に失敗した段階で打ち切る:
+    structure (長さ・範囲) -> challenge (ハッシュ) -> product (群の積) ->
+    commitment (シード木の展開とハッシュ) -> share (べき乗)。
+    べき乗は全ラウンドのコミットメントが正しい場合にのみ行う。
+    executor="process" の場合、commitment と share をプロセス並列で行う。
+    batch=True の場合、share は全ラウンドをまとめた 1 回の multi_exp で
+    確認し、失敗したときのみラウンドごとの確認に戻る
+    (結合の前に確認対象が位数 q の部分群の元か 1 つずつべき乗で確認するため、
+    p = kq + 1 の群ではラウンドごとの確認より速くなるとは限らない)
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}.")
+    _check_executor(executor)
+    work = VerificationWork()
+
+    def fail(stage: str, i: Optional[int] = None) -> VerificationResult:
+        return VerificationResult(False, work, stage, i)
+
+    m = len(sig.proofs)
+    if m == 0 or len(sig.salt) != SALT_LEN:
+        return fail("structure")
+    if isinstance(sig, SignatureView):
+        n = sig.n
+    else:
+        n = len(sig.proofs[0].commits)
+    # SignatureView は参照のたびにラウンドを復元するため、ここで 1 度だけ復元し
+    # 以降の段階では proofs を使う
+    proofs: List[MPCitHProof] = []
+    with instrument.stage("verify.structure"):
+        for i, proof in enumerate(sig.proofs):
+            if isinstance(sig, SignatureView) and not sig.canonical(i):
+                return fail("structure", i)
+            if not _check_structure(proof, params, mode, n):
+                return fail("structure", i)
+            proofs.append(proof)
+
+    with instrument.stage("verify.transcript"):
+        transcript = Transcript(params, mode, sig.salt)
+        if isinstance(sig, SignatureView):
+            # バイナリ形式ならラウンドを復元せずにそのまま取り込む
+            for i in range(m):
+                transcript.absorb_encoded(sig.transcript_bytes(i))
+        else:
+            for proof in proofs:
+                transcript.absorb_round(proof.commits, proof.group_shares)
+        digest = transcript.digest(message)
+    work.hashed_rounds = m
+
+    with instrument.stage("verify.challenge"):
+        challenges = generate_challenges(digest, m, n)
+        for i, proof in enumerate(proofs):
+            if proof.hidden_party != challenges[i]:
+                return fail("challenge", i)
+
+    if mode == "standard":
+        with instrument.stage("verify.product"):
+            for i, proof in enumerate(proofs):
+                if _product(proof.group_shares) != y:
+                    return fail("product", i)
+
+    opened: List[List[Tuple[int, Fq]]] = []
+    with instrument.stage("verify.commitment"):
+        if executor is None:
+            for i, proof in enumerate(proofs):
+                work.commitments += n - 1
+                shares = _opened_shares(proof, params, sig.salt, i)
+                if shares is None:
+                    return fail("commitment", i)
+                opened.append(shares)
+        else:
+            tasks = [(sig.salt, i, proof) for i, proof in enumerate(proofs)]
+            results = _parallel_map(_worker_open_round, tasks, params, workers)
+            for i, shares in enumerate(results):
+                work.commitments += n - 1
+                if shares is None:
+                    return fail("commitment", i)
+                opened.append(shares)
+
+    if batch:
+        work.multi_exps += 1
+        with instrument.stage("verify.batch_share"):
+            targets = [
+                _share_targets(proof, params, y, mode, shares)
+                for proof, shares in zip(proofs, opened)
+            ]
+            ok, exps = _batch_check_group_shares(params, targets)
+            work.exponentiations += exps
+            if ok:
+                return VerificationResult(True, work)
+        # 失敗したラウンドはラウンドごとの確認で特定する
+
+    if executor is None:
+        checks: Iterator[Tuple[bool, int]] = (
+            _check_group_shares(proof, params, y, mode, shares)
+            for proof, shares in zip(proofs, opened)
+        )
+    else:
+        group_tasks = [
+            (mode, y, proof, shares) for proof, shares in zip(proofs, opened)
+        ]
+        checks = _parallel_map(
+            _worker_check_group_shares, group_tasks, params, workers
+        )
+    with instrument.stage("verify.share"):
+        for i, (ok, exps) in enumerate(checks):
+            work.exponentiations += exps
+            if not ok:
+                return fail("share", i)
+
+    return VerificationResult(True, work)
 
-    # シェアの数が正しいか
-    if len(proof.group_shares) != n:
-        return False
-    # 開示されたパーティ数が正しいか (N-1)
-    if len(proof.opened_party) != n - 1:
-        return False
 
-    opened_indices = [idx for idx, _ in proof.opened_party]
+def _product(elements: Sequence[GroupElement]) -> GroupElement:
+    return GroupArray.from_elements(elements).product()
 
-    # 隠すべきパーティが開示されていないか
-    if proof.hidden_party in opened_indices:
+
+def _check_structure(
+    proof: MPCitHProof, params: Parameters, mode: str, n: int
+) -> bool:
+    """ハッシュもべき乗も使わない形式の確認 (要素数・インデックス・法)"""
+    if n < 2 or len(proof.commits) != n:
+        return False
+    # コミットメントは F_q の元 (範囲外だとトランスクリプトに符号化できない)
+    q = params.q
+    if not all(isinstance(c, int) and 0 <= c < q for c in proof.commits):
+        return False
+    if mode == "hypercube":
+        # 主パーティのシェアの数が正しいか (log2 N 個)
+        if n & (n - 1) or len(proof.group_shares) != n.bit_length() - 1:
+            return False
+    elif len(proof.group_shares) != n:
+        return False
+    # 隠すパーティのインデックスが範囲内か
+    if not 0 <= proof.hidden_party < n:
+        return False
+    # 兄弟シードの数と長さが正しいか (log2 N 個)
+    if len(proof.seed_path) != tree_depth(n):
+        return False
+    if any(len(seed) != SEED_LEN for seed in proof.seed_path):
         return False
-    # インデックスの重複や範囲外チェック
-    if len(set(opened_indices)) != n - 1:
+    # 最後のパーティを隠す場合に限り aux_share は開示しない
+    if (proof.hidden_party == n - 1) != (proof.aux_share is None):
         return False
+    if proof.aux_share is not None and proof.aux_share.q != params.q:
+        return False
+    # 群シェアは単位元でない同じ群の元
+    ctx = params.g.ctx
+    return all(g.ctx is ctx and g.value != 0 for g in proof.group_shares)
+
 
-    for idx, share in proof.opened_party:
+def _opened_shares(
+    proof: MPCitHProof, params: Parameters, salt: bytes, round_index: int
+) -> Optional[List[Tuple[int, Fq]]]:
+    """
+    兄弟シードから隠したパーティ以外のシェアを復元し、コミットメントを確認。
+    コミットメントが不正なら None (形式は _check_structure で確認済みとする)
+    """
+    n = len(proof.commits)
+    hidden = proof.hidden_party
+    leaves = SeedTree.reconstruct(proof.seed_path, hidden, n, salt, round_index)
+    opened_party = [
+        (idx, leaf_share(seed, params.q))  # type: ignore
+        for idx, seed in enumerate(leaves[:-1])
+        if idx != hidden
+    ]
+    if proof.aux_share is not None:
+        opened_party.append((n - 1, proof.aux_share))
+
+    for idx, share in opened_party:
         if commitment(share, params.q_len) != proof.commits[idx]:
-            return False
-        expected = params.g**share.value
-        if expected != proof.group_shares[idx]:
-            return False
+            return None
+    return opened_party
+
+
+def _share_targets(
+    proof: MPCitHProof,
+    params: Parameters,
+    y: GroupElement,
+    mode: str,
+    opened_party: List[Tuple[int, Fq]],
+) -> List[Tuple[int, GroupElement]]:
+    """開示したシェアごとに g^e == target となるべき (e, target) の組"""
+    if mode == "standard":
+        return [
+            (share.value, proof.group_shares[idx])
+            for idx, share in opened_party
+        ]
 
-    prod = proof.group_shares[0]
-    for gs in proof.group_shares[1:]:
-        prod = prod * gs
-    if prod != y:
-        return False
+    # group_shares[k] = g^{X_{k,0}} (X_{k,b}: 第 k 次元の主パーティ b のシェア)
+    # 各次元で隠したパーティを含まない主パーティのみ開示し確認する
+    shares: List[Fq] = [Fq(0, params.q)] * len(proof.commits)
+    for idx, share in opened_party:
+        shares[idx] = share
+    targets = []
+    for k, g0 in enumerate(proof.group_shares):
+        bit = 1 - ((proof.hidden_party >> k) & 1)
+        e = main_party_share(shares, k, bit).value
+        if bit == 1:
+            # 主パーティ 1 のシェアの像は y / g^{X_{k,0}}
+            g0 = y * GroupElement(pow(g0.value, -1, params.p), g0.ctx)
+        targets.append((e, g0))
+    return targets
+
+
+def _check_group_shares(
+    proof: MPCitHProof,
+    params: Parameters,
+    y: GroupElement,
+    mode: str,
+    opened_party: List[Tuple[int, Fq]],
+) -> Tuple[bool, int]:
+    """開示したシェアの像と群シェアの一致を確認 (結果, べき乗の回数)"""
+    exps = 0
+    for e, target in _share_targets(proof, params, y, mode, opened_party):
+        exps += 1
+        if params.g_pow(e) != target:
+            return False, exps
+    return True, exps
+
+
+def _batch_check_group_shares(
+    params: Parameters,
+    targets: List[List[Tuple[int, GroupElement]]],
+    weight_bits: int = 64,
+) -> Tuple[bool, int]:
+    """
+    全ラウンドの g^{e_j} == t_j を小さい重み r_j で結合し
+    g^{sum r_j e_j} == prod t_j^{r_j} を 1 回の multi_exp で確認する
+    (結果, 部分群の確認のべき乗の回数)。
+    結合が健全なのは位数 q の部分群の中に限られる (位数 k の成分は
+    重みによっては打ち消し合う) ため、先に各 t_j が部分群の元か確認する
+    """
+    distinct = {
+        t.value: t for round_targets in targets for _, t in round_targets
+    }
+    exps = 0
+    for t in distinct.values():
+        exps += 1
+        if not t.in_subgroup():
+            return False, exps
+    bits = max(1, min(weight_bits, params.q.bit_length() - 1))
+    g_exp = 0
+    bases: List[GroupElement] = []
+    weights: List[int] = []
+    for round_targets in targets:
+        for e, target in round_targets:
+            r = secrets.randbelow(2**bits - 1) + 1
+            g_exp += r * e
+            bases.append(target)
+            weights.append(r)
+    if not bases:
+        return True, exps
+    ok = params.g_pow(g_exp % params.q) == multi_exp(bases, weights)
+    return ok, exps
+
+
+def _commit_round(
+    params: Parameters,
+    secret_val: int,
+    n: int,
+    mode: str,
+    salt: bytes,
+    round_index: int,
+) -> Dict[str, Any]:
+    """1 ラウンド分のシェア生成・コミット・べき乗 (メッセージに依存しない部分)"""
+    # 各パーティのシェアはシード木の葉から導出し、最後のみ秘密との差分
+    with instrument.stage("sign.shares"):
+        tree = SeedTree.random(n, salt, round_index)
+        shares: List[Fq] = [
+            leaf_share(seed, params.q) for seed in tree.leaves()[:-1]
+        ]
+        randoms = FqArray.from_list(shares, params.q)
+        shares.append(Fq(secret_val, params.q) - randoms.sum())
+        field_shares = FieldShare(shares=shares, q=params.q)
+
+    with instrument.stage("sign.commitments"):
+        commits = [commitment(s, params.q_len) for s in shares]
+
+    broadcast_values: List[GroupElement]
+    with instrument.stage("sign.exponentiations"):
+        if mode == "hypercube":
+            broadcast_values = [
+                params.g_pow(main_party_share(shares, k, 0))
+                for k in range(n.bit_length() - 1)
+            ]
+        else:
+            exps = field_shares.exp(params.g_table)
+            broadcast_values = exps.shares.to_list()
+
+    return {
+        "tree": tree,
+        "shares": shares,
+        "commits": commits,
+        "group_shares": broadcast_values,
+    }
 
-    return True
+
+def _init_worker(params: Parameters):
+    global _worker_params
+    _worker_params = params
+
+
+def _worker_commit_round(task: Tuple[int, int, str, bytes, int]):
+    secret_val, n, mode, salt, round_index = task
+    return _commit_round(
+        _worker_params, secret_val, n, mode, salt, round_index  # type: ignore
+    )
+
+
+def _worker_open_round(
+    task: Tuple[bytes, int, MPCitHProof],
+) -> Optional[List[Tuple[int, Fq]]]:
+    salt, round_index, proof = task
+    return _opened_shares(
+        proof, _worker_params, salt, round_index  # type: ignore
+    )
+
+
+def _worker_check_group_shares(
+    task: Tuple[str, GroupElement, MPCitHProof, List[Tuple[int, Fq]]],
+) -> Tuple[bool, int]:
+    mode, y, proof, opened_party = task
+    return _check_group_shares(
+        proof, _worker_params, y, mode, opened_party  # type: ignore
+    )
+
+
+def _get_pool(params: Parameters, workers: int) -> ProcessPoolExecutor:
+    """
+    ワーカー数とパラメータごとにプロセスプールを使い回す。
+    パラメータ (g のべき乗表を含む) は各ワーカーの初期化時に一度だけ送る。
+    """
+    key = (workers, params.p, params.q, params.g.value)
+    pool = _pools.get(key)
+    if pool is None:
+        params.g_table  # 表を構築してから送る
+        # galois/numba のスレッドを抱えたままの fork を避けるため forkserver を使う
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+            initargs=(params,),
+        )
+        _pools[key] = pool
+    return pool
+
+
+def shutdown_workers():
+    """executor="process" で起動したワーカープロセスをすべて終了する"""
+    while _pools:
+        _, pool = _pools.popitem()
+        pool.shutdown()
+
+
+def _parallel_map(
+    fn: Callable,
+    tasks: Sequence,
+    params: Parameters,
+    workers: Optional[int],
+) -> Iterator:
+    # 分散実行し、投入順に結果を返す (完了したものから順に取り出せる)
+    workers = workers or os.cpu_count() or 1
+    pool = _get_pool(params, workers)
+    chunksize = max(1, len(tasks) // (4 * workers))
+    return pool.map(fn, tasks, chunksize=chunksize)
+
+
+def _check_executor(executor: Optional[str]):
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor must be one of {EXECUTORS}.")
 
 
 def sign(
-    message: bytes, secret_val: int, params: Parameters, n: int, m: int
+    message: bytes,
+    secret_val: int,
+    params: Parameters,
+    n: int,
+    m: int,
+    mode: str = "standard",
+    executor: Optional[str] = None,
+    workers: Optional[int] = None,
 ) -> WholeSignature:
     """
     message: 署名対象
     secret_val: 秘密鍵x
     n: パーティ数
     m: 繰り返し回数
+    mode: "standard" (N パーティを個別に模擬) または
+          "hypercube" (N = 2^D, 各次元 2 つの主パーティを模擬)
+    executor: None (逐次実行) または "process" (ラウンドをプロセス並列で生成)
+    workers: executor="process" のワーカー数 (省略時は CPU 数)
     """
+    pre = presign(secret_val, params, n, m, mode, executor, workers)
+    return sign_presigned(message, pre)
 
-    all_round_data = []
 
-    for _ in range(m):
-        field_shares = FieldShare.additive_secret_sharing(
-            secret_val, n=n, q=params.q
-        )
-        shares: List[Fq] = field_shares.shares
+class Presignature:
+    """
+    メッセージに依存しない署名の前半: salt と各ラウンドのシェア・コミットメント・
+    群シェア、およびそれらを取り込み済みのトランスクリプト。
+    一度しか使えない (異なるメッセージに使うと別のパーティが開示され、
+    2 回分の開示から秘密が復元できてしまう)
+    """
 
-        commits = [commitment(s, params.q_len) for s in shares]
+    __slots__ = (
+        "params",
+        "n",
+        "m",
+        "mode",
+        "salt",
+        "_rounds",
+        "_transcript",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        params: Parameters,
+        n: int,
+        m: int,
+        mode: str,
+        salt: bytes,
+        rounds: List[Dict[str, Any]],
+        transcript: Transcript,
+    ):
+        self.params = params
+        self.n = n
+        self.m = m
+        self.mode = mode
+        self.salt = salt
+        self._rounds: Optional[List[Dict[str, Any]]] = rounds
+        self._transcript: Optional[Transcript] = transcript
+        self._lock = threading.Lock()
+
+    @property
+    def used(self) -> bool:
+        return self._rounds is None
+
+    def take(self) -> Tuple[List[Dict[str, Any]], Transcript]:
+        """ラウンドの材料とトランスクリプトを取り出す (以後このインスタンスは使えない)"""
+        with self._lock:
+            rounds, transcript = self._rounds, self._transcript
+            self._rounds = self._transcript = None
+        if rounds is None or transcript is None:
+            raise ValueError("presignature has already been used.")
+        return rounds, transcript
+
+    def discard(self):
+        # 使わずに捨てる (シェアへの参照を手放す)
+        with self._lock:
+            self._rounds = self._transcript = None
+
+
+def check_sign_arguments(
+    n: int, mode: str = "standard", executor: Optional[str] = None
+):
+    """sign / presign の n, mode, executor の組を確認する (不正なら ValueError)"""
+    _check_mode(mode, n)
+    _check_executor(executor)
+
+
+def presign(
+    secret_val: int,
+    params: Parameters,
+    n: int,
+    m: int,
+    mode: str = "standard",
+    executor: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> Presignature:
+    """
+    sign のうちメッセージに依存しない部分 (シェア生成・コミット・べき乗と
+    トランスクリプトへの取り込み) を先に行う。引数は sign と同じ
+    """
+    check_sign_arguments(n, mode, executor)
 
-        group_share_obj = field_shares.exp(params.g)
-        broadcast_values: List[GroupElement] = group_share_obj.shares
+    salt = secrets.token_bytes(SALT_LEN)
 
-        all_round_data.append(
-            {
-                "shares": shares,
-                "commits": commits,
-                "group_shares": broadcast_values,
-            }
+    if executor is None:
+        rounds = (
+            _commit_round(params, secret_val, n, mode, salt, i)
+            for i in range(m)
         )
+    else:
+        tasks = [(secret_val, n, mode, salt, i) for i in range(m)]
+        rounds = _parallel_map(_worker_commit_round, tasks, params, workers)
 
-    # Fiat-Shamir
-    h = hashlib.sha256()
-    h.update(encode_message(message))
+    # 生成されたラウンドから順にトランスクリプトへ取り込む
+    transcript = Transcript(params, mode, salt)
+    material = []
+    for data in rounds:
+        with instrument.stage("sign.transcript"):
+            transcript.absorb_round(data["commits"], data["group_shares"])
+        material.append(data)
+    return Presignature(params, n, m, mode, salt, material, transcript)
 
-    for data in all_round_data:
-        for c in data["commits"]:
-            h.update(int_to_bytes(c, params.q_len))
-        for g_elem in data["group_shares"]:
-            h.update(int_to_bytes(g_elem.value, params.p_len))
 
-    digest = h.digest()
+def sign_presigned(message: bytes, pre: Presignature) -> WholeSignature:
+    """
+    事前計算した材料で署名する (メッセージのハッシュと開示のみ)。
+    pre は使用済みになる
+    """
+    material, transcript = pre.take()
+    n, m = pre.n, pre.m
+
+    # Fiat-Shamir (ラウンドは presign で取り込み済み)
+    with instrument.stage("sign.transcript"):
+        digest = transcript.digest(message)
 
-    challenges = generate_challenges(digest, m, n)
+    with instrument.stage("sign.challenge"):
+        challenges = generate_challenges(digest, m, n)
 
     # Response
     proofs = []
-    for i in range(m):
-        data = all_round_data[i]
-        hidden_idx = challenges[i]
-
-        opened_party = [
-            (idx, s)
-            for idx, s in enumerate(data["shares"])
-            if idx != hidden_idx
-        ]
+    with instrument.stage("sign.opening"):
+        for i in range(m):
+            data = material[i]
+            hidden_idx = challenges[i]
+            shares = data["shares"]
 
-        proof = MPCitHProof(
-            commits=data["commits"],
-            group_shares=data["group_shares"],
-            hidden_party=hidden_idx,
-            opened_party=opened_party,
-        )
-        proofs.append(proof)
+            proof = MPCitHProof(
+                commits=data["commits"],
+                group_shares=data["group_shares"],
+                hidden_party=hidden_idx,
+                seed_path=data["tree"].open(hidden_idx),
+                aux_share=None if hidden_idx == n - 1 else shares[-1],
+            )
+            proofs.append(proof)
 
-    return WholeSignature(proofs=proofs, challenge_seed=digest)
+    return WholeSignature(proofs=proofs, challenge_seed=digest, salt=pre.salt)
 
 
 def keygen(params: Parameters) -> KeyPair:
     x = Fq.random(params.q)
-    y = params.g**x
+    y = params.g_pow(x)
     return KeyPair(secret=x.value, public=y)
 
 
@@ -1,31 +1,92 @@
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from itertools import combinations_with_replacement
-from typing import Dict, List, Tuple
+from math import comb
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-from .finite_field import Fq
+import numpy as np
+
+from . import _kernels
+from .finite_field import Fq, FqArray
 
 Monomial = Tuple[int, ...]
 
 
+# シードから導出した係数行を保持する数 (これを超えたら古い行から捨てる)
+ROW_CACHE_SIZE = 16
+
+
 @dataclass(frozen=True)
 class MpProblem:
+    """
+    seed を渡すと係数を seed から SHAKE-256 で導出する。
+    各式の係数は必要になった時点で式ごとに生成してキャッシュするため、
+    公開鍵は (seed, d) だけで足りる
+    """
+
     n: int
     m: int
     q: int
     deg: int = 1
-    x: List[Fq] = field(init=False)
-    coeffs: List[Dict[Monomial, Fq]] = field(init=False)
+    seed: Optional[bytes] = None
+    x: Optional[List[Fq]] = field(init=False)  # 公開鍵のみの場合は None
     d: List[Fq] = field(init=False)
+    # 係数行列 (m, 単項式の数)。列は _monomials() の順
+    _coeffs: Optional[FqArray] = field(init=False, repr=False, compare=False)
+    _rows: "OrderedDict[int, FqArray]" = field(
+        init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.deg < 1:
             raise ValueError("deg must be >= 1.")
+        object.__setattr__(self, "_rows", OrderedDict())
+        coeffs = self._gen_coeffs() if self.seed is None else None
+        object.__setattr__(self, "_coeffs", coeffs)
         object.__setattr__(self, "x", self._gen_x())
-        object.__setattr__(self, "coeffs", self._gen_coeffs())
-        object.__setattr__(self, "d", self._evaluate_d())
+        d = self._evaluate_monomials(FqArray.from_list(self.x, self.q))
+        object.__setattr__(self, "d", d.to_list())
+
+    @classmethod
+    def from_seed(
+        cls,
+        seed: bytes,
+        d: Union[Sequence[Fq], FqArray],
+        n: int,
+        q: int,
+        deg: int = 1,
+    ) -> "MpProblem":
+        """公開鍵 (seed, d) から係数を必要に応じて再生成するインスタンス"""
+        obj = cls.__new__(cls)
+        obj._init_public(seed, d, n, q, deg)
+        return obj
+
+    def _init_public(
+        self,
+        seed: bytes,
+        d: Union[Sequence[Fq], FqArray],
+        n: int,
+        q: int,
+        deg: int,
+    ):
+        if deg < 1:
+            raise ValueError("deg must be >= 1.")
+        values = d if isinstance(d, FqArray) else FqArray.from_list(d, q)
+        for name, value in (
+            ("n", n),
+            ("m", len(values)),
+            ("q", q),
+            ("deg", deg),
+            ("seed", seed),
+            ("x", None),
+            ("d", values.to_list()),
+            ("_coeffs", None),
+            ("_rows", OrderedDict()),
+        ):
+            object.__setattr__(self, name, value)
 
     def _gen_x(self) -> List[Fq]:
-        return [Fq.random(self.q) for _ in range(self.n)]
+        return FqArray.random(self.q, self.n).to_list()
 
     def _monomials(self) -> List[Monomial]:
         monos: List[Monomial] = [()]  # () -> 定数項
@@ -33,28 +94,98 @@ class MpProblem:
             monos.extend(combinations_with_replacement(range(self.n), d))
         return monos
 
-    def _gen_coeffs(self) -> List[Dict[Monomial, Fq]]:
+    @property
+    def num_monomials(self) -> int:
+        return comb(self.n + self.deg, self.deg)
+
+    def _gen_coeffs(self) -> FqArray:
+        return FqArray.random(self.q, (self.m, self.num_monomials))
+
+    def _row_seed(self, i: int) -> bytes:
+        return self.seed + i.to_bytes(4, "big")  # type: ignore
+
+    def coeff_row(self, i: int) -> FqArray:
+        """第 i 式の係数 (_monomials() の順)"""
+        if not 0 <= i < self.m:
+            raise IndexError("equation index out of range.")
+        if self._coeffs is not None:
+            return self._coeffs[i]
+        row = self._rows.get(i)
+        if row is None:
+            row = FqArray.expand(self._row_seed(i), self.q, self.num_monomials)
+            self._rows[i] = row
+            if len(self._rows) > ROW_CACHE_SIZE:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(i)
+        return row
+
+    def constant_terms(self) -> FqArray:
+        # 各式の定数項 (シードからは各行の先頭だけを導出する)
+        if self._coeffs is not None or self.seed is None:
+            return FqArray(self.coeff_matrix.values[:, 0], self.q)
+        # SHAKE の出力と棄却サンプリングは先頭から順なので行の先頭と一致
+        return FqArray.from_list(
+            [
+                FqArray.expand(self._row_seed(i), self.q, 1)[0]
+                for i in range(self.m)
+            ],
+            self.q,
+        )
+
+    @property
+    def coeff_matrix(self) -> FqArray:
+        # シードから導出する場合は初回に全行を生成して保持する
+        if self._coeffs is None:
+            rows = [
+                FqArray.expand(self._row_seed(i), self.q, self.num_monomials)
+                for i in range(self.m)
+            ]
+            values = np.stack([r.values for r in rows])
+            object.__setattr__(self, "_coeffs", FqArray(values, self.q))
+        return self._coeffs  # type: ignore
+
+    @property
+    def coeffs(self) -> List[Dict[Monomial, Fq]]:
+        # 単項式 -> 係数 の辞書 (表示用)
         monos = self._monomials()
-        polys: List[Dict[Monomial, Fq]] = []
-        for _ in range(self.m):
-            poly: Dict[Monomial, Fq] = {}
-            for mono in monos:
-                poly[mono] = Fq.random(self.q)
-            polys.append(poly)
-        return polys
-
-    def _evaluate_d(self):
-        res: List[Fq] = []
-        for poly in self.coeffs:
-            acc = Fq(0, self.q)
-            for mono, c in poly.items():
-                if c.value == 0:
-                    continue
-                for idx in mono:
-                    c *= self.x[idx]
-                acc += c
-            res.append(acc)
-        return res
+        return [dict(zip(monos, row)) for row in self.coeff_matrix.to_list()]
+
+    def _monomial_values(self, x: FqArray) -> FqArray:
+        # 各単項式に x (..., n) を代入した値を _monomials() の順に並べる
+        q = self.q
+        xv = x.values
+        parts = [np.ones(xv.shape[:-1] + (1,), dtype=xv.dtype)]  # 定数項
+        for d in range(1, self.deg + 1):
+            idx = np.array(
+                list(combinations_with_replacement(range(self.n), d))
+            ).reshape(-1, d)
+            vals = xv[..., idx[:, 0]]
+            for k in range(1, d):
+                vals = (vals * xv[..., idx[:, k]]) % q
+            parts.append(vals)
+        return FqArray(np.concatenate(parts, axis=-1), q)
+
+    def _as_points(self, x: Union[Sequence[Fq], FqArray]) -> FqArray:
+        xs = x if isinstance(x, FqArray) else FqArray.from_list(x, self.q)
+        if xs.shape[-1] != self.n:
+            raise ValueError(f"x must have {self.n} coordinates.")
+        return xs
+
+    def _evaluate_monomials(self, xs: FqArray) -> FqArray:
+        # 係数行列と単項式の値の積 (次数によらない計算)
+        mono_vals = self._monomial_values(xs)
+        if mono_vals.values.ndim == 1:
+            return self.coeff_matrix @ mono_vals
+        mono_t = FqArray(mono_vals.values.T, self.q)
+        return FqArray((self.coeff_matrix @ mono_t).values.T, self.q)
+
+    def evaluate(self, x: Union[Sequence[Fq], FqArray]) -> FqArray:
+        """
+        P(x) = (p_1(x), ..., p_m(x))。
+        x は長さ n のベクトル、または (k, n) の k 個の点 (結果は (k, m))
+        """
+        return self._evaluate_monomials(self._as_points(x))
 
     def _poly_to_str(self, poly: Dict[Monomial, Fq]) -> str:
         terms = []
@@ -74,43 +205,40 @@ class MpProblem:
 
         return " + ".join(terms)
 
-    def mq_to_matrix_vector(self):
+    def _split_quadratic(
+        self, coeffs: FqArray
+    ) -> Tuple[FqArray, FqArray, FqArray]:
         """
-        x A_i x^T + x b_i^T = y_i
+        係数 (..., 単項式の数) を p(x) = x A x^T + x b^T + c の (A, b, c) に分ける。
+        A: (..., n, n) の上三角, b: (..., n), c: (...)
         """
         if not self.is_mq:
             raise ValueError("only for MQ problem (deg=2).")
+        n = self.n
+        cv = coeffs.values
+        # 2 次の単項式 (i, j) (i <= j) の並びは np.triu_indices と同じ
+        rows, cols = np.triu_indices(n)
+        A = np.zeros(cv.shape[:-1] + (n, n), dtype=cv.dtype)
+        A[..., rows, cols] = cv[..., slice(1 + n, None)]
+        b = cv[..., slice(1, 1 + n)]
+        c = cv[..., 0]
+        return FqArray(A, self.q), FqArray(b, self.q), FqArray(c, self.q)
+
+    def _quadratic_arrays(self) -> Tuple[FqArray, FqArray, FqArray]:
+        return self._split_quadratic(self.coeff_matrix)
 
-        forms = []
-        for poly, yi in zip(self.coeffs, self.d):
-            A = [[Fq(0, self.q) for _ in range(self.n)] for _ in range(self.n)]
-            b = [Fq(0, self.q) for _ in range(self.n)]
-            c = Fq(0, self.q)
-            for mono, coeff in poly.items():
-                if coeff.value == 0:
-                    continue
-                deg = len(mono)
-                if deg == 0:
-                    c += coeff
-                elif deg == 1:  # to b vector
-                    i = mono[0]  # mono = (i,)
-                    b[i] += coeff
-                elif deg == 2:  # to A matrix
-                    i, j = mono  # mono = (i, j) with i <= j
-                    if i == j:  # x_i^2
-                        A[i][i] += coeff
-                    else:  # x_i * x_j
-                        if i < j:
-                            A[i][j] += coeff  # A[i][j] + A[j][i] = coeff + 0
-                        else:
-                            # raise RuntimeError("not expected")
-                            A[j][i] += coeff  # A[i][j] + A[j][i] = 0 + coeff
-                else:
-                    raise ValueError("deg should be <= 2.")
-            # x A x^T + x b^T = y  (y = yi - c)
-            y_no_const = yi - c
-            forms.append({"A": A, "b": b, "c": c, "y": y_no_const})
-        return forms
+    def mq_to_matrix_vector(self):
+        """
+        x A_i x^T + x b_i^T = y_i
+        """
+        A, b, c = self._quadratic_arrays()
+        y = FqArray.from_list(self.d, self.q) - c
+        return [
+            {"A": A_i, "b": b_i, "c": c_i, "y": y_i}
+            for A_i, b_i, c_i, y_i in zip(
+                A.to_list(), b.to_list(), c.to_list(), y.to_list()
+            )
+        ]
 
     def pretty_matrix_form(self) -> str:
         if not self.is_mq:
@@ -166,16 +294,81 @@ class MpProblem:
 
 
 class MqProblem(MpProblem):
-    def __init__(self, n: int, m: int, q: int):
-        super().__init__(n=n, m=m, q=q, deg=2)
-        self.A: List[List[List[Fq]]] = []
-        self.b: List[List[Fq]] = []
-        self.y: List[Fq] = []
-        forms = self.mq_to_matrix_vector()
-        for f in forms:
-            self.A.append(f["A"])
-            self.b.append(f["b"])
-            self.y.append(f["y"])
+    """
+    A: (m, n, n), b: (m, n), c / y: (m,) の FqArray
+    (x A_i x^T + x b_i^T = y_i, y_i = p_i(x) - c_i)。
+    公開鍵は seed を使う場合 (seed, y) で、from_seed で復元できる
+    """
+
+    def __init__(self, n: int, m: int, q: int, seed: Optional[bytes] = None):
+        super().__init__(n=n, m=m, q=q, deg=2, seed=seed)
+        self._set_y(FqArray.from_list(self.d, q) - self.constant_terms())
+
+    def _set_y(self, y: FqArray):
+        object.__setattr__(self, "y", y)
+        object.__setattr__(self, "_matrix_form", None)
+
+    @classmethod
+    def from_seed(  # type: ignore[override]
+        cls, seed: bytes, y: Union[Sequence[Fq], FqArray], n: int, q: int
+    ) -> "MqProblem":
+        """公開鍵 (seed, y) から A_i, b_i を必要に応じて再生成するインスタンス"""
+        ys = y if isinstance(y, FqArray) else FqArray.from_list(y, q)
+        obj = cls.__new__(cls)
+        obj._init_public(seed, ys, n, q, 2)
+        obj._set_y(ys)
+        object.__setattr__(obj, "d", (ys + obj.constant_terms()).to_list())
+        return obj
+
+    def _matrices(self) -> Tuple[FqArray, FqArray, FqArray]:
+        if self._matrix_form is None:
+            object.__setattr__(self, "_matrix_form", self._quadratic_arrays())
+        return self._matrix_form  # type: ignore
+
+    @property
+    def A(self) -> FqArray:
+        return self._matrices()[0]
+
+    @property
+    def b(self) -> FqArray:
+        return self._matrices()[1]
+
+    @property
+    def c(self) -> FqArray:
+        return self._matrices()[2]
+
+    def equation(self, i: int) -> Tuple[FqArray, FqArray, Fq]:
+        """第 i 式の (A_i, b_i, c_i)。全体の行列を作らずに得られる"""
+        A_i, b_i, c_i = self._split_quadratic(self.coeff_row(i))
+        return A_i, b_i, Fq(int(c_i.values), self.q)
+
+    def _quadratic_forms(self, A: FqArray, xt: FqArray) -> FqArray:
+        # x A_i x^T を (式, 点) の順に並べる (xt: (n, k))
+        q, n = self.q, self.n
+        if _kernels.ENABLED and A.values.dtype != object:
+            return FqArray(_kernels.quad_form_mod(A.values, xt.values, q), q)
+        ax = FqArray(A.values.reshape(-1, n), q) @ xt
+        return (FqArray(ax.values.reshape(len(A), n, -1), q) * xt).sum(axis=1)
+
+    def evaluate(self, x: Union[Sequence[Fq], FqArray]) -> FqArray:
+        # 行列形式で x A_i x^T + x b_i^T + c_i をまとめて計算
+        q, n, m = self.q, self.n, self.m
+        xs = self._as_points(x)
+        xt = FqArray(xs.values.reshape(-1, n).T, q)  # (n, k)
+        if self._coeffs is None:
+            # 係数を保持していなければ式ごとに導出して評価 (メモリは式 1 本分)
+            out = []
+            for i in range(m):
+                A_i, b_i, c_i = self.equation(i)
+                A_1 = FqArray(A_i.values[None], q)  # (1, n, n)
+                quad = self._quadratic_forms(A_1, xt)[0]
+                out.append((quad + b_i @ xt + c_i).values)
+            res = FqArray(np.stack(out), q)
+        else:
+            A, b, c = self._matrices()
+            quad = self._quadratic_forms(A, xt)
+            res = quad + b @ xt + FqArray(c.values[:, None], q)
+        return FqArray(res.values.T.reshape(xs.shape[:-1] + (m,)), q)
 
 
 if __name__ == "__main__":
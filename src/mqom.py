@@ -0,0 +1,405 @@
+"""
+MQ 問題に基づく MPCitH 署名 (MQOM 型)
+
+秘密 x (P(x) = y) を N パーティへ加法的に分散し、
+ランダムな gamma in F_{q^eta}^m で m 本の式を 1 本にまとめた
+z = <x, w> (z = gamma . (y - b x), w = sum gamma_i A_i x) を
+内積のサクリファイス検査で確認する。
+
+各パーティのシェア [x], [u], [v] (u, v in F_{q^eta}^n), [c] (c = <u, v>) は
+シード木の葉から導出し、最後のパーティのみ補正値 (Δx, Δc) を加える。
+1. h1 = H(公開鍵, salt, メッセージ, コミットメント) から gamma, epsilon
+2. 各パーティは alpha_j = epsilon x_j + u_j, beta_j = w_j + v_j を公開し、
+   r_j = epsilon z_j + <alpha, v_j> + <u_j, beta> - c_j (r_0 は - <alpha, beta>)
+   を計算 (sum_j r_j = epsilon (z - <x, w>) + <u, v> - c = 0)
+3. h2 = H(h1, alpha_j, beta_j, r_j) から隠すパーティを選び、他を開示
+"""
+
+import hashlib
+import secrets
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ._mqom import MQMPCParameter, linear_z_w
+from .finite_field import Fq, FqArray, FqNArray
+from .mq_problem import MqProblem
+from .schnorr_fs import encode_message
+from .seed_tree import SEED_LEN, SeedTree, tree_depth
+
+SALT_LEN = 32
+DIGEST_LEN = 32  # SHA-256
+PK_SEED_LEN = 32  # 公開鍵の係数を導出する seed の長さ
+_MAX_Q = 2**31  # 値を 4 バイトでハッシュへ取り込む
+
+
+@dataclass(frozen=True)
+class PublicKey:
+    seed: bytes  # MQ 問題の係数を導出する seed
+    y: FqArray  # x A_i x^T + x b_i^T = y_i
+
+
+@dataclass(frozen=True)
+class KeyPair:
+    problem: MqProblem  # 秘密 x を含む
+    public: PublicKey
+
+    @property
+    def secret(self) -> List[Fq]:
+        return self.problem.x  # type: ignore
+
+
+@dataclass(frozen=True)
+class MQOMRound:
+    """1 回の繰り返しの応答"""
+
+    hidden_party: int
+    seed_path: List[bytes]  # 隠すパーティ以外の葉シードを復元する兄弟シード
+    hidden_commit: bytes
+    aux: Optional[FqArray]  # (Δx, Δc) (最後のパーティを隠す場合は None)
+    alpha: FqNArray  # 隠したパーティの alpha_j (n,)
+    beta: FqNArray  # 隠したパーティの beta_j (n,)
+
+
+@dataclass(frozen=True)
+class MQOMSignature:
+    salt: bytes
+    challenge_seed: bytes  # h2
+    rounds: List[MQOMRound]
+
+
+def _check_param(param: MQMPCParameter):
+    if param.q >= _MAX_Q:
+        raise ValueError(f"q must be < {_MAX_Q}.")
+    if not 2 <= param.N <= 2**16:
+        # _hidden_parties は 2 バイトずつ読んでパーティを選ぶ
+        raise ValueError("Number of parties N must be in [2, 2^16].")
+    if param.tau < 1:
+        raise ValueError("Number of repetitions tau must be >= 1.")
+
+
+def _encode(values: np.ndarray) -> bytes:
+    return np.ascontiguousarray(values, dtype=">u4").tobytes()
+
+
+def _total(a: FqNArray) -> np.ndarray:
+    # 先頭の軸に沿った和の係数 (FqN を経由しない)
+    return FqArray(a.coeffs, a.p).sum(axis=0).values
+
+
+@lru_cache(maxsize=8)
+def _problem(seed: bytes, y: bytes, n: int, q: int) -> MqProblem:
+    # 公開鍵から係数を再生成 (同じ鍵での繰り返しの検証では使い回す)
+    ys = FqArray(np.frombuffer(y, dtype=">u4").astype(np.int64), q)
+    return MqProblem.from_seed(seed, ys, n, q)
+
+
+def _public_problem(public: PublicKey, param: MQMPCParameter) -> MqProblem:
+    return _problem(public.seed, _encode(public.y.values), param.n, param.q)
+
+
+def keygen(param: MQMPCParameter, seed: Optional[bytes] = None) -> KeyPair:
+    _check_param(param)
+    seed = secrets.token_bytes(PK_SEED_LEN) if seed is None else seed
+    problem = MqProblem(n=param.n, m=param.m, q=param.q, seed=seed)
+    return KeyPair(problem=problem, public=PublicKey(seed, problem.y))
+
+
+def _party_shares(
+    leaves: List[Optional[bytes]], param: MQMPCParameter
+) -> Tuple[FqArray, FqNArray, FqNArray, FqNArray]:
+    """
+    葉シードごとに (x_j, u_j, v_j, c_j) を 1 回の伸長で導出する。
+    None (隠したパーティ) は 0 とする
+    """
+    q, n, eta = param.q, param.n, param.eta
+    size = n + 2 * n * eta + eta
+    rows = np.zeros((len(leaves), size), dtype=np.int64)
+    for j, seed in enumerate(leaves):
+        if seed is not None:
+            rows[j] = FqArray.expand(seed, q, size).values
+    k = len(leaves)
+    xs = FqArray(rows[:, slice(0, n)], q)
+    u = rows[:, slice(n, n + n * eta)].reshape(k, n, eta)
+    v = rows[:, slice(n + n * eta, n + 2 * n * eta)].reshape(k, n, eta)
+    c = rows[:, slice(n + 2 * n * eta, size)]
+    return (
+        xs,
+        FqNArray(u, q, eta),
+        FqNArray(v, q, eta),
+        FqNArray(c, q, eta),
+    )
+
+
+def _with_aux(
+    xs: FqArray, c: FqNArray, aux: FqArray, param: MQMPCParameter
+) -> Tuple[FqArray, FqNArray]:
+    # 最後のパーティのシェアへ補正値 (Δx, Δc) を加える
+    n, eta = param.n, param.eta
+    xv = xs.values.copy()
+    xv[-1] = (xv[-1] + aux.values[slice(0, n)]) % param.q
+    cv = c.coeffs.copy()
+    cv[-1] = (cv[-1] + aux.values[slice(n, n + eta)]) % param.q
+    return FqArray(xv, param.q), FqNArray(cv, param.q, eta)
+
+
+def _commit(
+    salt: bytes, e: int, j: int, seed: bytes, aux: Optional[FqArray]
+) -> bytes:
+    h = hashlib.sha256()
+    h.update(salt)
+    h.update(e.to_bytes(2, "big"))
+    h.update(j.to_bytes(2, "big"))
+    h.update(seed)
+    if aux is not None:
+        h.update(_encode(aux.values))
+    return h.digest()
+
+
+def _first_challenge(
+    h1: bytes, e: int, param: MQMPCParameter
+) -> Tuple[FqNArray, FqNArray]:
+    # h1 から繰り返し e の gamma (m,) と epsilon を導出
+    drawn = FqArray.expand(
+        h1 + e.to_bytes(2, "big"), param.q, (param.m + 1, param.eta)
+    ).values
+    gamma = FqNArray(drawn[slice(0, param.m)], param.q, param.eta)
+    return gamma, FqNArray(drawn[param.m], param.q, param.eta)
+
+
+def _hidden_parties(h2: bytes, tau: int, n_parties: int) -> List[int]:
+    # 2 バイトずつ読み、棄却サンプリングで [0, N) の値を tau 個得る
+    limit = 65536 - 65536 % n_parties
+    out: List[int] = []
+    length = 4 * tau
+    while len(out) < tau:
+        out = []
+        raw = hashlib.shake_256(h2).digest(length)
+        for i in range(0, length, 2):
+            v = int.from_bytes(raw[slice(i, i + 2)], "big")
+            if v < limit:
+                out.append(v % n_parties)
+                if len(out) == tau:
+                    break
+        length *= 2
+    return out
+
+
+def _party_messages(
+    problem: MqProblem,
+    gamma: FqNArray,
+    eps: FqNArray,
+    xs: FqArray,
+    u: FqNArray,
+    v: FqNArray,
+) -> Tuple[FqNArray, FqNArray, FqNArray]:
+    """全パーティの alpha_j, beta_j と z_j (x_j に関する線形な部分)"""
+    z, w = linear_z_w(problem, gamma, xs)
+    alpha = eps * xs + u
+    beta = w + v
+    # gamma . y は パーティ 0 が加える
+    z_coeffs = z.coeffs.copy()
+    z_coeffs[0] = (z_coeffs[0] + _total(gamma * problem.y)) % problem.q
+    return alpha, beta, FqNArray(z_coeffs, problem.q, gamma.n)
+
+
+def _inner_rows(a: FqNArray, v: FqNArray) -> FqNArray:
+    """
+    各行 v_j (v: (k, n)) と a (n,) の内積。
+    a_l 倍は F_q 上の線形写像なので (n * eta, eta) の行列にまとめ、
+    F_{q^eta} の乗算 n 回分で k 行すべてを F_q 上の縮約 1 回で求める
+    """
+    p, eta = a.p, a.n
+    # 1, x, ..., x^{eta-1}
+    basis = FqNArray(np.eye(eta, dtype=np.int64), p, eta)
+    maps = FqNArray(a.coeffs[:, None, :], p, eta) * basis  # (n, eta)
+    rows = FqArray(v.coeffs.reshape(len(v), -1), p)
+    out = rows @ FqArray(maps.coeffs.reshape(-1, eta), p)
+    return FqNArray(out.values, p, eta)
+
+
+def _responses(
+    eps: FqNArray,
+    z: FqNArray,
+    alpha: FqNArray,
+    beta: FqNArray,
+    u: FqNArray,
+    v: FqNArray,
+    c: FqNArray,
+) -> FqNArray:
+    """r_j = epsilon z_j + <alpha, v_j> + <u_j, beta> - c_j (- <alpha, beta>)"""
+    p, n = eps.p, eps.n
+    a = FqNArray(_total(alpha), p, n)
+    b = FqNArray(_total(beta), p, n)
+    r = eps * z + _inner_rows(a, v) + _inner_rows(b, u) - c
+    r.coeffs[0] = (r.coeffs[0] - _total(a * b)) % p
+    return r
+
+
+def _absorb_messages(
+    h: "hashlib._Hash", alpha: FqNArray, beta: FqNArray, r: FqNArray
+):
+    h.update(_encode(alpha.coeffs))
+    h.update(_encode(beta.coeffs))
+    h.update(_encode(r.coeffs))
+
+
+def _first_hash(
+    public: PublicKey, salt: bytes, message: bytes, commits: List[bytes]
+) -> bytes:
+    h = hashlib.sha256()
+    h.update(public.seed)
+    h.update(_encode(public.y.values))
+    h.update(salt)
+    h.update(encode_message(message))
+    h.update(b"".join(commits))
+    return h.digest()
+
+
+def sign(
+    message: bytes, key_pair: KeyPair, param: MQMPCParameter
+) -> MQOMSignature:
+    _check_param(param)
+    problem = key_pair.problem
+    q, eta, N = param.q, param.eta, param.N
+    x = FqArray.from_list(key_pair.secret, q)
+    salt = secrets.token_bytes(SALT_LEN)
+
+    states = []
+    commits: List[bytes] = []
+    for e in range(param.tau):
+        tree = SeedTree.random(N, salt, e)
+        leaves = tree.leaves()
+        xs, u, v, c = _party_shares(leaves, param)  # type: ignore
+        delta_x = x - xs.sum(axis=0)
+        uv = FqNArray(_total(u), q, eta) * FqNArray(_total(v), q, eta)
+        delta_c = _total(uv) - _total(c)
+        aux = FqArray(np.concatenate((delta_x.values, delta_c)), q)
+        xs, c = _with_aux(xs, c, aux, param)
+        round_commits = [
+            _commit(salt, e, j, seed, aux if j == N - 1 else None)
+            for j, seed in enumerate(leaves)
+        ]
+        commits.extend(round_commits)
+        states.append((tree, xs, u, v, c, aux, round_commits))
+
+    h1 = _first_hash(key_pair.public, salt, message, commits)
+
+    h = hashlib.sha256(h1)
+    messages = []
+    for e, (_, xs, u, v, c, _, _) in enumerate(states):
+        gamma, eps = _first_challenge(h1, e, param)
+        alpha, beta, z = _party_messages(problem, gamma, eps, xs, u, v)
+        r = _responses(eps, z, alpha, beta, u, v, c)
+        _absorb_messages(h, alpha, beta, r)
+        messages.append((alpha, beta))
+    h2 = h.digest()
+
+    rounds = []
+    hidden = _hidden_parties(h2, param.tau, N)
+    for e, i in enumerate(hidden):
+        tree, _, _, _, _, aux, round_commits = states[e]
+        alpha, beta = messages[e]
+        rounds.append(
+            MQOMRound(
+                hidden_party=i,
+                seed_path=tree.open(i),
+                hidden_commit=round_commits[i],
+                aux=None if i == N - 1 else aux,
+                alpha=FqNArray(alpha.coeffs[i], q, eta),
+                beta=FqNArray(beta.coeffs[i], q, eta),
+            )
+        )
+    return MQOMSignature(salt=salt, challenge_seed=h2, rounds=rounds)
+
+
+def _check_round(round_: MQOMRound, param: MQMPCParameter) -> bool:
+    # べき乗・ハッシュの前に形式を確認
+    n, eta, N = param.n, param.eta, param.N
+    if not 0 <= round_.hidden_party < N:
+        return False
+    if len(round_.seed_path) != tree_depth(N):
+        return False
+    if any(len(s) != SEED_LEN for s in round_.seed_path):
+        return False
+    if len(round_.hidden_commit) != DIGEST_LEN:
+        return False
+    if (round_.hidden_party == N - 1) != (round_.aux is None):
+        return False
+    if round_.aux is not None and round_.aux.shape != (n + eta,):
+        return False
+    return all(
+        a.p == param.q and a.n == eta and a.shape == (n,)
+        for a in (round_.alpha, round_.beta)
+    )
+
+
+def verify(
+    message: bytes,
+    sig: MQOMSignature,
+    public: PublicKey,
+    param: MQMPCParameter,
+) -> bool:
+    _check_param(param)
+    q, eta, N = param.q, param.eta, param.N
+    if len(sig.rounds) != param.tau or len(sig.salt) != SALT_LEN:
+        return False
+    # 別のパラメータの公開鍵
+    if public.y.q != q or public.y.values.shape != (param.m,):
+        return False
+    if not all(_check_round(rd, param) for rd in sig.rounds):
+        return False
+    hidden = _hidden_parties(sig.challenge_seed, param.tau, N)
+    if [rd.hidden_party for rd in sig.rounds] != hidden:
+        return False
+    problem = _public_problem(public, param)
+
+    states = []
+    commits: List[bytes] = []
+    for e, rd in enumerate(sig.rounds):
+        i = rd.hidden_party
+        leaves = SeedTree.reconstruct(rd.seed_path, i, N, sig.salt, e)
+        xs, u, v, c = _party_shares(leaves, param)
+        aux = rd.aux
+        if aux is None:
+            aux = FqArray.zeros(q, param.n + eta)  # 隠したパーティが最後
+        xs, c = _with_aux(xs, c, aux, param)
+        for j, seed in enumerate(leaves):
+            if j == i:
+                commits.append(rd.hidden_commit)
+            else:
+                last = rd.aux if j == N - 1 else None
+                commits.append(_commit(sig.salt, e, j, seed, last))  # type: ignore
+        states.append((xs, u, v, c))
+
+    h1 = _first_hash(public, sig.salt, message, commits)
+
+    h = hashlib.sha256(h1)
+    for e, (rd, (xs, u, v, c)) in enumerate(zip(sig.rounds, states)):
+        i = rd.hidden_party
+        gamma, eps = _first_challenge(h1, e, param)
+        alpha, beta, z = _party_messages(problem, gamma, eps, xs, u, v)
+        # 隠したパーティの alpha, beta は署名から、r は総和が 0 となる値
+        alpha.coeffs[i] = rd.alpha.coeffs
+        beta.coeffs[i] = rd.beta.coeffs
+        r = _responses(eps, z, alpha, beta, u, v, c)
+        r.coeffs[i] = 0
+        r.coeffs[i] = -_total(r) % q
+        _absorb_messages(h, alpha, beta, r)
+
+    return secrets.compare_digest(h.digest(), sig.challenge_seed)
+
+
+if __name__ == "__main__":
+    param = MQMPCParameter(N=16, tau=32)
+    key_pair = keygen(param)
+    message = b"Hello MQOM"
+    print(f"MQ 問題: n={param.n}, m={param.m}, q={param.q}")
+    sig = sign(message, key_pair, param)
+    print(f"署名の繰り返し数: {len(sig.rounds)}")
+    assert verify(message, sig, key_pair.public, param)
+    print("署名は有効")
+    assert not verify(b"Fake Message", sig, key_pair.public, param)
+    print("改ざん検知成功")
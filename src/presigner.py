@@ -0,0 +1,143 @@
+"""
+MPCitH 署名の事前計算 (オフライン/オンライン分割)
+
+    with Presigner(secret, params, n, m) as pool:
+        sig = pool.sign(message)
+
+メッセージに依存しない部分 (シェア・コミットメント・べき乗とトランスクリプトへの
+取り込み) をバックグラウンドのスレッドで Presignature として作り溜めておき、
+sign ではメッセージのハッシュと開示の選択だけを行う。プールが空なら sign の中でその場で作る。
+各 Presignature は取り出した時点で一度だけ使われ、プールに戻されることはない
+"""
+
+import queue
+import threading
+from typing import Optional
+
+from .group import Parameters
+from .mpcith import (
+    Presignature,
+    WholeSignature,
+    check_sign_arguments,
+    presign,
+    sign_presigned,
+)
+
+
+class Presigner:
+    """
+    secret_val, params, n, m, mode, executor, workers: mpcith.sign と同じ
+    size: プールに溜める Presignature の上限
+    background: True ならスレッドでプールを補充し続ける
+        (executor="process" なら各 Presignature のラウンドはワーカープロセスで作る)
+    """
+
+    def __init__(
+        self,
+        secret_val: int,
+        params: Parameters,
+        n: int,
+        m: int,
+        mode: str = "standard",
+        size: int = 8,
+        executor: Optional[str] = None,
+        workers: Optional[int] = None,
+        background: bool = True,
+    ):
+        if size < 1:
+            raise ValueError("size must be positive.")
+        # 補充のスレッドで失敗しないよう、引数は先に確認する
+        check_sign_arguments(n, mode, executor)
+        self._args = (secret_val, params, n, m, mode, executor, workers)
+        self._pool: "queue.Queue[Presignature]" = queue.Queue(maxsize=size)
+        self._closed = threading.Event()
+        self.hits = 0  # プールから取り出せた回数
+        self.misses = 0  # その場で作った回数
+        self._thread: Optional[threading.Thread] = None
+        if background:
+            self._thread = threading.Thread(
+                target=self._refill, name="presigner", daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def size(self) -> int:
+        return self._pool.maxsize
+
+    @property
+    def available(self) -> int:
+        """プールにある Presignature の数 (目安)"""
+        return self._pool.qsize()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def _presign(self) -> Presignature:
+        return presign(*self._args)
+
+    def _refill(self):
+        while not self._closed.is_set():
+            pre = self._presign()
+            while not self._closed.is_set():
+                try:
+                    self._pool.put(pre, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                pre.discard()
+
+    def fill(self) -> int:
+        """プールが一杯になるまで呼び出し元で作る。追加した数を返す"""
+        self._check_open()
+        added = 0
+        while not self._pool.full():
+            try:
+                self._pool.put_nowait(self._presign())
+            except queue.Full:  # バックグラウンドの補充と競合した
+                break
+            added += 1
+        return added
+
+    def sign(
+        self,
+        message: bytes,
+        block: bool = False,
+        timeout: Optional[float] = None,
+    ) -> WholeSignature:
+        """
+        プールの Presignature で署名する。
+        block=False (または timeout 経過) でプールが空なら、その場で作って署名する
+        """
+        self._check_open()
+        try:
+            pre = self._pool.get(block=block, timeout=timeout)
+            self.hits += 1
+        except queue.Empty:
+            pre = self._presign()
+            self.misses += 1
+        return sign_presigned(message, pre)
+
+    def close(self):
+        """補充を止め、プールに残った Presignature を破棄する"""
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        while True:
+            try:
+                self._pool.get_nowait().discard()
+            except queue.Empty:
+                break
+
+    def _check_open(self):
+        if self._closed.is_set():
+            raise ValueError("presigner is closed.")
+
+    def __enter__(self) -> "Presigner":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
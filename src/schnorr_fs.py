@@ -1,8 +1,10 @@
 import hashlib
+import secrets
 from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
 
 from .finite_field import Fq
-from .group import GroupElement, Parameters, generate_parameters
+from .group import GroupElement, Parameters, generate_parameters, multi_exp
 
 
 @dataclass(frozen=True)
@@ -18,6 +20,17 @@ class Signature:
     z: Fq
 
 
+@dataclass(frozen=True)
+class BatchResult:
+    """一括検証の結果 (invalid: 不正な署名の items 内インデックス)"""
+
+    invalid: List[int]
+
+    @property
+    def ok(self) -> bool:
+        return not self.invalid
+
+
 def int_to_bytes(x: int, length: int) -> bytes:
     return x.to_bytes(length, "big")
 
@@ -58,7 +71,7 @@ def compute_challenge(
 
 def keygen(params: Parameters) -> KeyPair:
     x = Fq.random(params.q)
-    y = params.g**x
+    y = params.g_pow(x)
     return KeyPair(x=x, y=y)
 
 
@@ -74,7 +87,7 @@ def sign(
       署名: (u, c, z)
     """
     r = Fq.random(params.q)
-    u = params.g**r
+    u = params.g_pow(r)
     c = compute_challenge(params, y, u, message)
     z = r + c * x
     return Signature(u=u, c=c, z=z)
@@ -86,7 +99,90 @@ def verify(
     c2 = compute_challenge(params, y, sig.u, message)
     if sig.c != c2:
         return False
-    return params.g**sig.z == sig.u * (y**c2)
+    # g^z == u * y^c  <=>  g^z * y^(-c) == u  (y は <g> の元)
+    return multi_exp([params.g_table, y], [sig.z, -c2.value]) == sig.u
+
+
+def _batch_holds(
+    params: Parameters,
+    items: Sequence[Tuple[GroupElement, bytes, Signature]],
+    indices: List[int],
+    weights: Dict[int, int],
+) -> bool:
+    """
+    prod_i (g^{z_i} * y_i^{-c_i} * u_i^{-1})^{r_i} == 1 を 1 回の multi_exp で確認
+    """
+    q = params.q
+    g_exp = 0
+    y_exps: Dict[int, int] = {}  # 同じ公開鍵の指数はまとめる
+    y_elems: Dict[int, GroupElement] = {}
+    bases: List = []
+    exps: List[int] = []
+    for i in indices:
+        y, _, sig = items[i]
+        r = weights[i]
+        g_exp += r * sig.z.value
+        y_exps[y.value] = (y_exps.get(y.value, 0) - r * sig.c.value) % q
+        y_elems[y.value] = y
+        u_inv = GroupElement(pow(sig.u.value, -1, params.p), params.g.ctx)
+        bases.append(u_inv)
+        exps.append(r)
+    bases.append(params.g_table)
+    exps.append(g_exp)
+    for key, e in y_exps.items():
+        bases.append(y_elems[key])
+        exps.append(e)
+    return multi_exp(bases, exps).value == 1
+
+
+def _find_invalid(
+    params: Parameters,
+    items: Sequence[Tuple[GroupElement, bytes, Signature]],
+    indices: List[int],
+    weights: Dict[int, int],
+) -> List[int]:
+    # 一括検証に失敗したら二分して不正な署名を特定
+    if not indices or _batch_holds(params, items, indices, weights):
+        return []
+    if len(indices) == 1:
+        return indices
+    mid = len(indices) // 2
+    return _find_invalid(params, items, indices[:mid], weights) + (
+        _find_invalid(params, items, indices[mid:], weights)
+    )
+
+
+def verify_batch(
+    params: Parameters,
+    items: Sequence[Tuple[GroupElement, bytes, Signature]],
+    weight_bits: int = 64,
+) -> BatchResult:
+    """
+    items: (公開鍵 y, メッセージ, 署名) の列
+    各検証式をランダムな小さい重み r_i で結合し、まとめて 1 回で検証する。
+    結合が健全なのは位数 q の部分群の中に限られる (位数 k の成分は重みに
+    よっては打ち消し合う) ため、u_i と公開鍵が部分群の元かを先に確認し、
+    外にあるものは不正とする (公開鍵は異なるものごとに 1 回)
+    """
+    invalid: List[int] = []
+    pending: List[int] = []
+    members: Dict[int, bool] = {}
+    for i, (y, message, sig) in enumerate(items):
+        if y.value not in members:
+            members[y.value] = y.in_subgroup()
+        if (
+            not members[y.value]
+            or sig.c != compute_challenge(params, y, sig.u, message)
+            or not sig.u.in_subgroup()
+        ):
+            invalid.append(i)
+        else:
+            pending.append(i)
+
+    bits = max(1, min(weight_bits, params.q.bit_length() - 1))
+    weights = {i: secrets.randbelow(2**bits - 1) + 1 for i in pending}
+    invalid += _find_invalid(params, items, pending, weights)
+    return BatchResult(invalid=sorted(invalid))
 
 
 if __name__ == "__main__":
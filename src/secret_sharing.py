@@ -1,55 +1,86 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Optional, Union
 
-from .finite_field import Fq
-from .group import GroupElement, generate_parameters
+from . import instrument
+from .finite_field import Fq, FqArray
+from .group import (
+    FixedBaseTable,
+    GroupArray,
+    GroupElement,
+    generate_parameters,
+)
+
+SHARE_SEED_LEN = 32  # additive_secret_sharing の seed 長 (バイト)
 
 
 @dataclass(frozen=True)
 class FieldShare:
-    shares: List[Fq]
+    """シェアは FqArray で保持する (Fq のリストを渡した場合も変換する)"""
+
+    shares: FqArray
     q: int
 
+    def __post_init__(self):
+        shares = self.shares
+        if not isinstance(shares, FqArray):
+            shares = FqArray.from_list(shares, self.q)
+            object.__setattr__(self, "shares", shares)
+        if shares.q != self.q:
+            raise ValueError("Mismatch between share modulus and q.")
+
     def reconstruct(self) -> int:
-        sum_ = Fq(0, self.q)
-        for s in self.shares:
-            sum_ += s
-        return sum_.value
+        return self.shares.sum().value
 
-    def exp(self, g: GroupElement) -> "GroupShare":
+    def exp(self, g: Union[GroupElement, FixedBaseTable]) -> "GroupShare":
         if g.q != self.q:
             raise ValueError(
                 "Mismatch between field modulus q and group order q."
             )
-        exp_shares = [g**s.value for s in self.shares]
-        return GroupShare(exp_shares, g.p, g.q)
+        exps = self.shares.values.tolist()
+        if isinstance(g, FixedBaseTable):
+            return GroupShare(g.pow_many(exps), g.p, g.q)
+        instrument.count("exponentiations", len(exps))
+        values = [pow(g.value, e, g.p) for e in exps]
+        return GroupShare(GroupArray._wrap(values, g.ctx), g.p, g.q)
 
     @classmethod
     def additive_secret_sharing(
-        cls, secret: int, n: int, q: int
+        cls, secret: int, n: int, q: int, seed: Optional[bytes] = None
     ) -> "FieldShare":
+        """
+        seed を渡すと最初の n-1 個のシェアを seed から決定的に導出する
+        (同じ seed・secret から同じシェアを再生成できる)
+        """
         if n < 2:
             raise ValueError("Number of shares n must be >= 2.")
-        shares = [Fq(0, q) for _ in range(n)]
-        sum_ = Fq(0, q)
-        for i in range(n - 1):
-            shares[i] = Fq.random(q)
-            sum_ += shares[i]
-        shares[-1] = Fq(secret, q) - sum_
+        if seed is None:
+            randoms = FqArray.random(q, n - 1)
+        elif len(seed) != SHARE_SEED_LEN:
+            raise ValueError(f"seed must be {SHARE_SEED_LEN} bytes.")
+        else:
+            randoms = FqArray.expand(seed, q, n - 1)
+        shares = randoms.append(Fq(secret, q) - randoms.sum())
         return cls(shares=shares, q=q)
 
 
 @dataclass(frozen=True)
 class GroupShare:
-    shares: List[GroupElement]
+    """シェアは GroupArray で保持する (GroupElement のリストも変換する)"""
+
+    shares: GroupArray
     p: int
     q: int
 
+    def __post_init__(self):
+        shares = self.shares
+        if not isinstance(shares, GroupArray):
+            shares = GroupArray.from_elements(shares)
+            object.__setattr__(self, "shares", shares)
+        if (shares.p, shares.q) != (self.p, self.q):
+            raise ValueError("Mismatch between share group and (p, q).")
+
     def product(self) -> GroupElement:
-        prod = self.shares[0]
-        for s in self.shares[1:]:
-            prod = prod * s
-        return prod
+        return self.shares.product()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+import hashlib
+import secrets
+from typing import List, Optional
+
+from . import instrument
+
+SEED_LEN = 16  # 各ノードのシード長 (バイト)
+
+
+def tree_depth(n: int) -> int:
+    # n 枚の葉を持つ二分木の深さ
+    return max(1, (n - 1).bit_length())
+
+
+def _expand(seed: bytes, salt: bytes, round_index: int, node: int) -> bytes:
+    # PRG: 親シード -> 子 2 つ分のシード (SHAKE-256)
+    instrument.count("hash_bytes", len(salt) + 6 + len(seed))
+    h = hashlib.shake_256()
+    h.update(salt)
+    h.update(round_index.to_bytes(2, "big"))
+    h.update(node.to_bytes(4, "big"))
+    h.update(seed)
+    return h.digest(2 * SEED_LEN)
+
+
+def _fill(
+    nodes: List[Optional[bytes]], salt: bytes, round_index: int
+) -> List[Optional[bytes]]:
+    # 既知のノードから子孫を順に展開 (ヒープ順なので親は必ず先に現れる)
+    first_leaf = len(nodes) // 2
+    for v in range(first_leaf):
+        seed = nodes[v]
+        if seed is None:
+            continue
+        children = _expand(seed, salt, round_index, v)
+        nodes[2 * v + 1] = children[:SEED_LEN]
+        nodes[2 * v + 2] = children[SEED_LEN:]
+    return nodes
+
+
+class SeedTree:
+    """
+    GGM 木: 根シードから各パーティの葉シードを導出する。
+    1 つの葉を隠して他のすべての葉を開示するには、
+    根から隠す葉への経路上の兄弟ノード (深さ個) を渡せばよい。
+    """
+
+    def __init__(
+        self, root: bytes, n: int, salt: bytes = b"", round_index: int = 0
+    ):
+        if n < 2:
+            raise ValueError("Number of leaves n must be >= 2.")
+        if len(root) != SEED_LEN:
+            raise ValueError(f"root seed must be {SEED_LEN} bytes.")
+        self.n = n
+        self.depth = tree_depth(n)
+        nodes: List[Optional[bytes]] = [None] * (2 ** (self.depth + 1) - 1)
+        nodes[0] = root
+        self._nodes = _fill(nodes, salt, round_index)
+
+    @classmethod
+    def random(
+        cls, n: int, salt: bytes = b"", round_index: int = 0
+    ) -> "SeedTree":
+        return cls(secrets.token_bytes(SEED_LEN), n, salt, round_index)
+
+    def leaves(self) -> List[bytes]:
+        first_leaf = len(self._nodes) // 2
+        return self._nodes[slice(first_leaf, first_leaf + self.n)]  # type: ignore
+
+    def open(self, hidden: int) -> List[bytes]:
+        """隠す葉以外を再展開するための兄弟シード (根に近い順)"""
+        if not 0 <= hidden < self.n:
+            raise ValueError("hidden leaf index out of range.")
+        path = []
+        for v in _path(hidden, self.depth):
+            path.append(self._nodes[_sibling(v)])
+        return path  # type: ignore
+
+    @staticmethod
+    def reconstruct(
+        path: List[bytes],
+        hidden: int,
+        n: int,
+        salt: bytes = b"",
+        round_index: int = 0,
+    ) -> List[Optional[bytes]]:
+        """兄弟シードから葉シードを復元 (隠した葉は None)"""
+        depth = tree_depth(n)
+        if len(path) != depth:
+            raise ValueError("seed path length mismatch.")
+        if not 0 <= hidden < n:
+            raise ValueError("hidden leaf index out of range.")
+        nodes: List[Optional[bytes]] = [None] * (2 ** (depth + 1) - 1)
+        for v, seed in zip(_path(hidden, depth), path):
+            nodes[_sibling(v)] = seed
+        _fill(nodes, salt, round_index)
+        first_leaf = len(nodes) // 2
+        return nodes[slice(first_leaf, first_leaf + n)]
+
+
+def _path(leaf: int, depth: int) -> List[int]:
+    # 根の子から葉までの経路上のノード (ヒープ番号)
+    v = 2**depth - 1 + leaf
+    path = []
+    while v > 0:
+        path.append(v)
+        v = (v - 1) // 2
+    return path[::-1]
+
+
+def _sibling(v: int) -> int:
+    return v + 1 if v % 2 == 1 else v - 1
@@ -0,0 +1,27 @@
+from benchmarks.suite import compare, measure
+
+
+def _report(**medians):
+    return {
+        "results": [
+            {"name": name, "params": {"N": 16}, "median_ms": ms}
+            for name, ms in medians.items()
+        ]
+    }
+
+
+def test_compare_flags_regressions():
+    """基準より threshold 倍を超えて遅いケースのみ報告 (新規のケースは無視)"""
+    baseline = _report(sign=10.0, verify=10.0)
+    current = _report(sign=13.0, verify=11.0, keygen=1.0)
+    regressions = compare(current, baseline, threshold=1.2)
+    assert [(r["case"], r["metric"]) for r in regressions] == [
+        ("sign[N=16]", "median_ms")
+    ]
+    assert compare(current, baseline, threshold=1.5) == []
+
+
+def test_measure_reports_statistics():
+    row = measure(lambda: sum(range(1000)), repeat=5)
+    assert 0 < row["median_ms"] <= row["p95_ms"]
+    assert row["ops_per_sec"] > 0 and row["peak_kib"] >= 0
@@ -0,0 +1,133 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src import _kernels
+from src.finite_field import FieldContext, Fq, FqArray, FqN, FqNArray
+
+
+@pytest.mark.parametrize("q", [31, 65521, 2**61 - 1, 2**127 - 1])
+def test_fq_array_matches_fq(q):
+    """FqArray の演算結果が Fq の逐次計算と一致"""
+    a = FqArray.random(q, 7)
+    b = FqArray.random(q, 7)
+    la, lb = a.to_list(), b.to_list()
+
+    assert (a + b).to_list() == [x + y for x, y in zip(la, lb)]
+    assert (a - b).to_list() == [x - y for x, y in zip(la, lb)]
+    assert (a * b).to_list() == [x * y for x, y in zip(la, lb)]
+    assert (-a).to_list() == [-x for x in la]
+
+    expected = Fq(0, q)
+    for x, y in zip(la, lb):
+        expected += x * y
+    assert a.dot(b) == expected
+    assert FqArray.from_list(la) == a
+
+
+def test_fq_array_matmul_and_sum():
+    """行列ベクトル積と総和 (int64 溢れ対策の分割縮約を含む)"""
+    q = 2**31 - 1
+    M = FqArray.random(q, (4, 5))
+    x = FqArray.random(q, 5)
+    rows = M.to_list()
+    xs = x.to_list()
+    expected = []
+    for row in rows:
+        acc = Fq(0, q)
+        for a, b in zip(row, xs):
+            acc += a * b
+        expected.append(acc)
+    assert (M @ x).to_list() == expected
+    assert M.sum(axis=1).to_list() == [sum(r, Fq(0, q)) for r in rows]
+    assert x.sum() == sum(xs, Fq(0, q))
+
+
+@pytest.mark.parametrize("q", [2**31 - 1, 2**61 - 1])
+def test_fq_array_stacked_matmul(q):
+    """積み重ねた行列どうしの積 (縮約軸を分割する場合を含む)"""
+    a = FqArray.random(q, (2, 3, 4))
+    b = FqArray.random(q, (2, 4, 5))
+    ao, bo = a.values.astype(object), b.values.astype(object)
+    assert ((a @ b).values == (ao @ bo) % q).all()
+    x = FqArray.random(q, 4)
+    assert ((a @ x).values == (ao @ x.values.astype(object)) % q).all()
+
+
+@pytest.mark.skipif(not _kernels.ENABLED, reason="numba unavailable")
+@pytest.mark.parametrize("q", [31, 2**31 - 1])
+def test_kernels_match_numpy(q):
+    """コンパイルしたカーネルと object 配列による計算が一致"""
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, q, (3, 6, 7))
+    b = rng.integers(0, q, (7, 4))
+    x = rng.integers(0, q, 7)
+    A = rng.integers(0, q, (5, 7, 7))
+    xt = rng.integers(0, q, (7, 3))
+    ao, bo, xo = a.astype(object), b.astype(object), x.astype(object)
+
+    assert (_kernels.matmul_mod(a, b, q) == (ao @ bo) % q).all()
+    assert (_kernels.matmul_mod(a, x, q) == (ao @ xo) % q).all()
+    assert (_kernels.sum_mod(a, q) == ao.sum(axis=0) % q).all()
+    xto = xt.astype(object)
+    quad = np.einsum("ist,sp,tp->ip", A.astype(object), xto, xto)
+    assert (_kernels.quad_form_mod(A, xt, q) == quad % q).all()
+
+
+def test_field_context_is_shared():
+    """同じ q の元は同じ FieldContext を参照し、pickle 後も変わらない"""
+    a, b = Fq(3, 31), FqArray.from_list([Fq(4, 31)])[0]
+    assert a.ctx is b.ctx is FieldContext(31)
+    assert Fq(1, a.ctx).ctx is a.ctx and a.ctx.byte_len == 1
+    assert pickle.loads(pickle.dumps(a)).ctx is a.ctx
+    arr = FqArray.random(31, 4)
+    assert arr.ctx is a.ctx and (arr + a)[0].ctx is a.ctx
+    assert pickle.loads(pickle.dumps(arr)).ctx is a.ctx
+    with pytest.raises(TypeError):
+        a + Fq(3, 37)
+    with pytest.raises(TypeError):
+        arr + FqArray.random(37, 4)
+    with pytest.raises(ValueError):
+        Fq(1, 1)
+
+
+def test_fq_array_modulus_mismatch():
+    with pytest.raises(TypeError):
+        FqArray.zeros(31, 3) + FqArray.zeros(37, 3)
+
+
+def test_fq_n_array_matches_fq_n():
+    """FqNArray の演算結果が FqN (galois) の逐次計算と一致"""
+    p, n = 31, 10
+    a = FqNArray.random(p, n, 6)
+    b = FqNArray.random(p, n, 6)
+    la, lb = a.to_list(), b.to_list()
+
+    assert (a + b).to_list() == [x + y for x, y in zip(la, lb)]
+    assert (a - b).to_list() == [x - y for x, y in zip(la, lb)]
+    assert (a * b).to_list() == [x * y for x, y in zip(la, lb)]
+    assert (a / b).to_list() == [x / y for x, y in zip(la, lb)]
+
+    expected = FqN.zero(p, n)
+    for x, y in zip(la, lb):
+        expected += x * y
+    assert a.dot(b) == expected
+    assert FqNArray.from_list(la) == a
+
+
+def test_fq_n_array_base_field_broadcast():
+    """F_q の元・行列との積が埋め込み後の積と一致"""
+    p, n = 31, 10
+    a = FqNArray.random(p, n, 4)
+    c = Fq.random(p)
+    assert (a * c).to_list() == [x * c for x in a.to_list()]
+
+    M = FqArray.random(p, (3, 4))
+    expected = []
+    for row in M.to_list():
+        acc = FqN.zero(p, n)
+        for m_ij, x in zip(row, a.to_list()):
+            acc += FqN.embed(m_ij, n) * x
+        expected.append(acc)
+    assert (M @ a).to_list() == expected
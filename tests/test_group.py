@@ -0,0 +1,138 @@
+import json
+import pickle
+import secrets
+from dataclasses import replace
+
+import pytest
+
+from src.group import (
+    FixedBaseTable,
+    GroupArray,
+    GroupContext,
+    GroupElement,
+    generate_parameters,
+    get_parameters,
+    load_parameters,
+    multi_exp,
+    validate_parameters,
+)
+
+
+@pytest.fixture(scope="module")
+def params():
+    return generate_parameters(q_bits=64)
+
+
+def test_group_context_is_shared(params):
+    """同じ (p, q) の元は同じ GroupContext を参照し、pickle 後も変わらない"""
+    a = GroupElement(5, params.p, params.q)
+    assert a.ctx is params.g.ctx is GroupContext(params.p, params.q)
+    assert (a.p, a.q, a.ctx.p_len) == (params.p, params.q, params.p_len)
+    b = pickle.loads(pickle.dumps(a))
+    assert b.ctx is a.ctx and b == a
+    other = GroupElement(5, params.p, params.q + 2)
+    assert other.ctx is not a.ctx and other != a
+    with pytest.raises(TypeError):
+        a * other
+
+
+@pytest.mark.parametrize("window", [1, 3, 6, 8])
+def test_fixed_base_table_matches_pow(params, window):
+    """べき乗表による計算が通常のべき乗と一致"""
+    table = FixedBaseTable(params.g, window)
+    for e in [0, 1, params.q - 1] + [
+        secrets.randbelow(params.q) for _ in range(20)
+    ]:
+        assert table**e == params.g**e
+
+
+def test_parameters_cache_table(params):
+    """g のべき乗表は Parameters ごとに一度だけ構築"""
+    p = replace(params, window=4)
+    assert p.g_table is p.g_table
+    assert p.g_table.window == 4
+    assert p == params
+    assert p.g_pow(12345) == params.g**12345
+
+
+@pytest.mark.parametrize("k", [1, 2, 7, 40])
+def test_multi_exp_matches_naive(params, k):
+    """Straus / Pippenger の結果が個別のべき乗の積と一致"""
+    bases = [params.g ** secrets.randbelow(params.q) for _ in range(k)]
+    exps = [secrets.randbelow(params.q) for _ in range(k)]
+    expected = GroupElement(1, params.p, params.q)
+    for b, e in zip(bases, exps):
+        expected = expected * b**e
+    assert multi_exp(bases, exps) == expected
+    # 固定底の表を混ぜても同じ結果
+    assert multi_exp([params.g_table] + bases, [-3] + exps) == (
+        expected * params.g ** (-3)
+    )
+
+
+def test_group_array_product_and_pow_many(params):
+    """表による一括べき乗と int のままの積が元ごとの計算と一致"""
+    exps = [secrets.randbelow(params.q) for _ in range(40)]
+    arr = params.g_table.pow_many(exps)
+    elems = [params.g**e for e in exps]
+    assert arr.to_list() == elems
+    assert GroupArray.from_elements(elems) == arr
+    assert arr[3] == elems[3] and arr[5:8].to_list() == elems[5:8]
+
+    expected = elems[0]
+    for e in elems[1:]:
+        expected = expected * e
+    assert arr.product() == expected == params.g ** sum(exps)
+
+
+def test_seeded_generation_is_deterministic():
+    a = generate_parameters(q_bits=48, seed=b"fleet")
+    assert a == generate_parameters(q_bits=48, seed=b"fleet")
+    assert a != generate_parameters(q_bits=48, seed=b"other")
+    validate_parameters(a)
+
+
+def test_parameter_store(tmp_path):
+    """保存・検証付き読み込み・プロセス内レジストリ"""
+    path = str(tmp_path / "params.json")
+    params = get_parameters(q_bits=40, seed=b"store", path=path)
+    assert get_parameters(q_bits=40, seed=b"store") is params
+    assert load_parameters(path) == params
+    # 記録された seed と異なる seed では読み込まない
+    with pytest.raises(ValueError):
+        get_parameters(q_bits=40, seed=b"other", path=path)
+
+    with open(path) as f:
+        data = json.load(f)
+    data["g"] = 1
+    with open(path, "w") as f:
+        json.dump(data, f)
+    with pytest.raises(ValueError):
+        load_parameters(path)
+
+
+def test_generate_parameters_p_bits_and_workers():
+    """p のビット長指定、並列探索は逐次と同じ結果"""
+    params = generate_parameters(q_bits=64, p_bits=200, seed=b"p_bits")
+    assert params.p.bit_length() == 200
+    validate_parameters(params)
+
+    parallel = generate_parameters(
+        q_bits=64, p_bits=200, seed=b"p_bits", workers=2
+    )
+    assert parallel == params
+
+    with pytest.raises(ValueError):
+        generate_parameters(q_bits=64, p_bits=65)
+
+
+@pytest.mark.parametrize("q_bits, p_bits", [(16, 18), (64, 66), (64, 67)])
+def test_generate_parameters_narrow_p_bits(q_bits, p_bits):
+    """p の範囲に素数が無い q は選び直す (範囲が狭くても止まる)"""
+    for seed in range(10):
+        params = generate_parameters(
+            q_bits=q_bits, p_bits=p_bits, seed=bytes([seed])
+        )
+        assert params.p.bit_length() == p_bits
+        assert params.q.bit_length() == q_bits
+        validate_parameters(params)
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from src import instrument
+from src.finite_field import Fq
+from src.group import GroupElement, generate_parameters
+from src.mpcith import keygen, sign, verify_signature
+from src.presigner import Presigner
+
+
+@pytest.fixture(scope="module")
+def params():
+    return generate_parameters(q_bits=16)
+
+
+def test_recording_sign_and_verify(params):
+    """段階ごとの時間と、べき乗・ハッシュのカウンタを記録"""
+    key_pair = keygen(params)
+    n, m = 8, 4
+    with instrument.recording() as rec:
+        sig = sign(b"msg", key_pair.secret, params, n, m)
+    report = rec.to_dict()
+    assert report["counters"]["exponentiations"] == n * m
+    assert report["stages"]["sign.commitments"]["calls"] == m
+    assert report["counters"]["hash_bytes"] > 0
+
+    with instrument.recording(rec):  # 同じ Recorder に合算
+        assert verify_signature(sig, b"msg", params, key_pair.public)
+    report = rec.to_dict()
+    assert report["counters"]["exponentiations"] == n * m + (n - 1) * m
+    assert report["stages"]["verify.share"]["calls"] == 1
+    assert report["counters"]["fq_allocations"] > 0
+
+
+def test_disabled_and_restored(params):
+    """記録の外では何も数えず、差し替えたメソッドも元に戻る"""
+    init, mul = Fq.__init__, GroupElement.__mul__
+    with instrument.recording() as rec:
+        with pytest.raises(RuntimeError):
+            with instrument.recording():
+                pass
+    assert (Fq.__init__, GroupElement.__mul__) == (init, mul)
+    params.g * params.g
+    assert rec.to_dict() == {"stages": {}, "counters": {}}
+
+
+def test_other_threads_not_recorded(params):
+    """補充スレッドの処理は記録せず、記録したスレッドの分だけを数える"""
+    key_pair = keygen(params)
+    n, m = 8, 4
+    with Presigner(key_pair.secret, params, n, m, size=10_000) as pool:
+        # 補充が始まってから記録する
+        deadline = time.monotonic() + 30
+        while pool.available == 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        with instrument.recording() as rec:
+            for _ in range(5):
+                sign(b"msg", key_pair.secret, params, n, m)
+                time.sleep(0.01)  # 補充スレッドにも処理させる
+    assert rec.to_dict()["counters"]["exponentiations"] == 5 * n * m
@@ -1,7 +1,22 @@
+from dataclasses import replace
+
 import pytest
 
-from src.group import generate_parameters
-from src.mpcith import KeyPair, keygen, sign, verify_signature
+from src.group import GroupElement, generate_parameters
+from src.mpcith import (
+    KeyPair,
+    Presignature,
+    SignatureView,
+    Transcript,
+    WholeSignature,
+    keygen,
+    presign,
+    shutdown_workers,
+    sign,
+    sign_presigned,
+    verify_signature,
+    verify_signature_detailed,
+)
 
 
 @pytest.fixture(scope="module")
@@ -67,3 +82,237 @@ def test_verify_fails_with_wrong_key(params, key_pair):
     )
 
     assert is_valid is False
+
+
+def test_verify_fails_with_tampered_seed_path(params, key_pair):
+    """開示した兄弟シードを改ざんすると検証失敗"""
+    message = b"Seed tree"
+    signature = sign(message, key_pair.secret, params, n=8, m=10)
+    proof = signature.proofs[0]
+    assert len(proof.seed_path) == 3  # log2(8)
+
+    bad_path = [bytes(len(proof.seed_path[0]))] + proof.seed_path[1:]
+    tampered = replace(
+        signature,
+        proofs=[replace(proof, seed_path=bad_path)] + signature.proofs[1:],
+    )
+    assert not verify_signature(tampered, message, params, key_pair.public)
+
+
+def test_verify_detailed_stages(params, key_pair):
+    """失敗した段階を報告し、べき乗の前に打ち切る"""
+    message = b"Detailed"
+    n, m = 8, 10
+    signature = sign(message, key_pair.secret, params, n, m)
+
+    result = verify_signature_detailed(
+        signature, message, params, key_pair.public
+    )
+    assert result.ok and result.stage is None
+    assert result.work.exponentiations == m * (n - 1)
+
+    result = verify_signature_detailed(
+        signature, b"Tampered", params, key_pair.public
+    )
+    assert result.stage == "challenge"
+    assert result.work.commitments == result.work.exponentiations == 0
+
+    other = keygen(params).public
+    result = verify_signature_detailed(signature, message, params, other)
+    assert result.stage == "product" and result.work.exponentiations == 0
+
+    proof = signature.proofs[4]
+    bad_path = [bytes(len(proof.seed_path[0]))] + proof.seed_path[1:]
+    proofs = list(signature.proofs)
+    proofs[4] = replace(proof, seed_path=bad_path)
+    result = verify_signature_detailed(
+        replace(signature, proofs=proofs), message, params, key_pair.public
+    )
+    assert (result.stage, result.round_index) == ("commitment", 4)
+    assert result.work.exponentiations == 0
+
+    proofs[4] = replace(proof, hidden_party=n)
+    result = verify_signature_detailed(
+        replace(signature, proofs=proofs), message, params, key_pair.public
+    )
+    assert (result.stage, result.round_index) == ("structure", 4)
+    assert result.work.hashed_rounds == 0
+
+    # 範囲外のコミットメントも例外を送出せず structure で失敗する
+    for bad in (-1, params.q, 2 ** (8 * params.q_len)):
+        proofs[4] = replace(proof, commits=[bad] + proof.commits[1:])
+        result = verify_signature_detailed(
+            replace(signature, proofs=proofs), message, params, key_pair.public
+        )
+        assert (result.stage, result.round_index) == ("structure", 4)
+
+
+@pytest.mark.parametrize("mode", ["standard", "hypercube"])
+def test_batch_verification(params, key_pair, mode):
+    """まとめた確認はラウンドごとの確認と同じ結果・失敗ラウンドを返す"""
+    message = b"Batch"
+    signature = sign(message, key_pair.secret, params, n=8, m=10, mode=mode)
+    result = verify_signature_detailed(
+        signature, message, params, key_pair.public, mode=mode, batch=True
+    )
+    assert result.ok and result.work.multi_exps == 1
+    # べき乗は確認対象の部分群の確認のみ (ラウンドごとの確認以下)
+    assert 0 < result.work.exponentiations <= 10 * 7
+
+    # ハイパーキューブには積の確認がないため、誤った鍵は share で失敗する
+    other = keygen(params).public
+    strict = verify_signature_detailed(
+        signature, message, params, other, mode=mode
+    )
+    batched = verify_signature_detailed(
+        signature, message, params, other, mode=mode, batch=True
+    )
+    assert not strict.ok and not batched.ok
+    assert (batched.stage, batched.round_index) == (
+        strict.stage,
+        strict.round_index,
+    )
+
+
+def test_batch_verification_rejects_small_order_component(params, key_pair):
+    """
+    位数 2 の元 (-1) を掛けた群シェアは、重みによらずまとめた確認でも
+    ラウンドごとの確認と同じく拒否される
+    """
+    message = b"Small order"
+    n, m = 8, 4
+    for _ in range(8):
+        pre = presign(key_pair.secret, params, n, m)
+        material, _ = pre.take()
+        # 2 つのシェアに -1 を掛ける (積は変わらない)
+        shares = material[0]["group_shares"]
+        for j in (0, 1):
+            shares[j] = GroupElement(params.p - shares[j].value, shares[j].ctx)
+        transcript = Transcript(params, pre.mode, pre.salt)
+        for data in material:
+            transcript.absorb_round(data["commits"], data["group_shares"])
+        forged = sign_presigned(
+            message,
+            Presignature(
+                params, n, m, pre.mode, pre.salt, material, transcript
+            ),
+        )
+        strict = verify_signature_detailed(
+            forged, message, params, key_pair.public
+        )
+        batched = verify_signature_detailed(
+            forged, message, params, key_pair.public, batch=True
+        )
+        assert (strict.stage, strict.round_index) == ("share", 0)
+        assert (batched.stage, batched.round_index) == ("share", 0)
+
+
+def test_hypercube_mode(params, key_pair):
+    """ハイパーキューブモードの署名は同じモードでのみ検証を通過"""
+    message = b"Hypercube"
+    signature = sign(
+        message, key_pair.secret, params, n=16, m=10, mode="hypercube"
+    )
+    assert all(len(p.group_shares) == 4 for p in signature.proofs)
+
+    assert verify_signature(
+        signature, message, params, key_pair.public, mode="hypercube"
+    )
+    assert not verify_signature(signature, message, params, key_pair.public)
+    assert not verify_signature(
+        signature, b"Tampered", params, key_pair.public, mode="hypercube"
+    )
+
+    with pytest.raises(ValueError):
+        sign(message, key_pair.secret, params, n=12, m=10, mode="hypercube")
+
+
+def test_process_executor(params, key_pair):
+    """プロセス並列で生成した署名も逐次・並列の両方で検証を通過"""
+    message = b"Parallel"
+    signature = sign(
+        message,
+        key_pair.secret,
+        params,
+        n=8,
+        m=6,
+        executor="process",
+        workers=2,
+    )
+    assert verify_signature(signature, message, params, key_pair.public)
+    assert verify_signature(
+        signature,
+        message,
+        params,
+        key_pair.public,
+        executor="process",
+        workers=2,
+    )
+    assert not verify_signature(
+        signature, b"Tampered", params, key_pair.public, executor="process"
+    )
+    shutdown_workers()
+
+
+def test_wire_format_round_trip(params, key_pair):
+    """バイナリ形式の往復変換と、遅延読み出しでの検証"""
+    message = b"Wire format"
+    signature = sign(message, key_pair.secret, params, n=8, m=10)
+    data = signature.to_bytes(params)
+
+    assert WholeSignature.from_bytes(data, params) == signature
+
+    view = SignatureView(data, params)
+    assert view.m == 10 and view.n == 8
+    assert view.commit(3, 5) == signature.proofs[3].commits[5]
+    assert view.proof(7) == signature.proofs[7]
+    assert verify_signature(view, message, params, key_pair.public)
+
+    with pytest.raises(ValueError):
+        SignatureView(data[:-1], params)
+    with pytest.raises(ValueError):
+        replace(signature, salt=signature.salt[:-1]).to_bytes(params)
+
+
+def test_wire_format_rejects_non_canonical(params, key_pair):
+    """法を足した群シェアの符号化はどちらの復元経路でも受け付けない"""
+    message = b"Malleable"
+    signature = sign(message, key_pair.secret, params, n=8, m=10)
+    data = bytearray(signature.to_bytes(params))
+    view = SignatureView(bytes(data), params)
+    # 範囲に収まる群シェアを 1 つ選び、p を足して書き戻す
+    p, ln = params.p, params.p_len
+    i, j = next(
+        (i, j)
+        for i in range(view.m)
+        for j in range(view.k)
+        if view.group_share(i, j).value + p < 2 ** (8 * ln)
+    )
+    at = len(data) - (view.m - i) * view.round_len + view._shares_at + j * ln
+    data[slice(at, at + ln)] = (view.group_share(i, j).value + p).to_bytes(
+        ln, "big"
+    )
+
+    with pytest.raises(ValueError):
+        WholeSignature.from_bytes(bytes(data), params)
+    result = verify_signature_detailed(
+        SignatureView(bytes(data), params), message, params, key_pair.public
+    )
+    assert (result.stage, result.round_index) == ("structure", i)
+
+
+def test_signature_view_decodes_each_round_once(params, key_pair, monkeypatch):
+    """検証中に SignatureView の各ラウンドを復元するのは 1 回だけ"""
+    message = b"Decode once"
+    signature = sign(message, key_pair.secret, params, n=8, m=10)
+    view = SignatureView(signature.to_bytes(params), params)
+    decoded = []
+    proof = SignatureView.proof
+
+    def counted(self, i):
+        decoded.append(i)
+        return proof(self, i)
+
+    monkeypatch.setattr(SignatureView, "proof", counted)
+    assert verify_signature(view, message, params, key_pair.public)
+    assert decoded == list(range(10))
@@ -0,0 +1,44 @@
+from src.finite_field import FqArray
+from src.mq_problem import ROW_CACHE_SIZE, MpProblem, MqProblem
+
+
+def test_mq_matrix_form_matches_monomials():
+    """行列形式での評価が単項式での評価・秘密 x の像 d と一致"""
+    mq = MqProblem(n=6, m=5, q=31)
+    assert mq.A.shape == (5, 6, 6) and mq.b.shape == (5, 6)
+    assert mq.evaluate(mq.x).to_list() == mq.d
+    assert MpProblem.evaluate(mq, mq.x).to_list() == mq.d
+
+    points = FqArray.random(31, (4, 6))
+    batch = mq.evaluate(points)
+    assert batch.shape == (4, 5)
+    for k in range(4):
+        assert batch[k] == MpProblem.evaluate(mq, points[k])
+
+
+def test_mp_batch_evaluate():
+    mp = MpProblem(n=3, m=2, q=65521, deg=3)
+    points = FqArray.random(65521, (3, 3))
+    batch = mp.evaluate(points)
+    assert [batch[k] for k in range(3)] == [mp.evaluate(p) for p in points]
+
+
+def test_seed_compressed_public_key():
+    """(seed, y) だけから同じ問題を復元し、式ごとの導出で評価できる"""
+    seed = bytes(range(32))
+    mq = MqProblem(n=8, m=20, q=31, seed=seed)
+    assert mq.evaluate(mq.x).to_list() == mq.d
+
+    public = MqProblem.from_seed(seed, mq.y, n=8, q=31)
+    assert public.x is None and public.m == 20
+    assert public.y == mq.y and public.d == mq.d
+
+    # 係数行列を作らずに式ごとに導出して評価 (キャッシュは上限まで)
+    points = FqArray.random(31, (3, 8))
+    assert public.evaluate(points) == mq.evaluate(points)
+    assert public._coeffs is None
+    assert len(public._rows) <= ROW_CACHE_SIZE
+
+    A_3, b_3, c_3 = public.equation(3)
+    assert A_3 == mq.A[3] and b_3 == mq.b[3] and c_3 == mq.c[3]
+    assert public.A == mq.A
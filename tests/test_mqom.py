@@ -0,0 +1,79 @@
+from dataclasses import replace
+
+import pytest
+
+from src._mqom import MQMPCParameter, compute_z_w
+from src.finite_field import Fq, FqN, FqNArray
+from src.mq_problem import MqProblem
+from src.mqom import keygen, sign, verify
+
+
+def _reference_z_w(mq, gamma):
+    # 式ごとに FqN で計算する素朴な実装
+    q, eta = mq.q, gamma[0].n
+    z = FqN.zero(q, eta)
+    w = [FqN.zero(q, eta) for _ in range(mq.n)]
+    for i in range(mq.m):
+        bx = sum((b * x for b, x in zip(mq.b[i], mq.x)), Fq(0, q))
+        z += gamma[i] * FqN.embed(mq.y[i] - bx, eta)
+        for j in range(mq.n):
+            a_x = sum((a * x for a, x in zip(mq.A[i][j], mq.x)), Fq(0, q))
+            w[j] += gamma[i] * FqN.embed(a_x, eta)
+    return z, w
+
+
+def test_compute_z_w_matches_reference():
+    """固定した gamma で一括計算と素朴な計算の z, w が一致"""
+    param = MQMPCParameter(m=7, n=6)
+    mq = MqProblem(n=param.n, m=param.m, q=param.q)
+    gamma = FqNArray.random(param.q, param.eta, param.m)
+
+    z, w = compute_z_w(mq, param, gamma=gamma)
+    assert (z, w) == _reference_z_w(mq, gamma.to_list())
+    assert compute_z_w(mq, param, gamma=gamma.to_list()) == (z, w)
+
+    xw = FqN.zero(param.q, param.eta)
+    for x, w_j in zip(mq.x, w):
+        xw += FqN.embed(x, param.eta) * w_j
+    assert z == xw
+
+
+@pytest.fixture(scope="module")
+def small():
+    """小さいパラメータ（計算コスト削減）"""
+    param = MQMPCParameter(m=8, n=8, N=8, tau=4)
+    return param, keygen(param)
+
+
+def test_sign_verify(small):
+    param, key_pair = small
+    sig = sign(b"msg", key_pair, param)
+    assert verify(b"msg", sig, key_pair.public, param)
+    assert not verify(b"other", sig, key_pair.public, param)
+    assert not verify(b"msg", sig, keygen(param).public, param)
+
+
+def test_tampered_signature_rejected(small):
+    param, key_pair = small
+    sig = sign(b"msg", key_pair, param)
+    rd = sig.rounds[0]
+    beta = FqNArray((rd.beta.coeffs + 1) % param.q, param.q, param.eta)
+    rounds = [replace(rd, beta=beta)] + sig.rounds[1:]
+    assert not verify(
+        b"msg", replace(sig, rounds=rounds), key_pair.public, param
+    )
+    rounds = [replace(rd, hidden_party=(rd.hidden_party + 1) % param.N)]
+    rounds += sig.rounds[1:]
+    assert not verify(
+        b"msg", replace(sig, rounds=rounds), key_pair.public, param
+    )
+
+
+def test_verify_rejects_mismatched_parameters(small):
+    """別のパラメータの公開鍵は例外を送出せず False"""
+    param, key_pair = small
+    sig = sign(b"msg", key_pair, param)
+    other = replace(param, m=param.m + 1)
+    assert not verify(b"msg", sig, keygen(other).public, param)
+    with pytest.raises(ValueError):
+        verify(b"msg", sig, key_pair.public, replace(param, N=2**16 + 1))
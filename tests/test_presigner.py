@@ -0,0 +1,80 @@
+import pytest
+
+from src import instrument
+from src.group import generate_parameters
+from src.mpcith import keygen, presign, sign_presigned, verify_signature
+from src.presigner import Presigner
+
+N, M = 5, 8
+
+
+@pytest.fixture(scope="module")
+def params():
+    return generate_parameters(q_bits=16)
+
+
+@pytest.fixture(scope="module")
+def key_pair(params):
+    return keygen(params)
+
+
+@pytest.mark.parametrize("mode, n", [("standard", N), ("hypercube", 8)])
+def test_presigned_signature_verifies(params, key_pair, mode, n):
+    """事前計算した材料での署名が検証を通過し、再利用はできない"""
+    pre = presign(key_pair.secret, params, n, M, mode=mode)
+    sig = sign_presigned(b"presigned", pre)
+    assert pre.used
+    assert verify_signature(sig, b"presigned", params, key_pair.public, mode)
+    assert not verify_signature(sig, b"other", params, key_pair.public, mode)
+    with pytest.raises(ValueError):
+        sign_presigned(b"other", pre)
+
+
+def test_online_sign_hashes_only_message(params, key_pair):
+    """ラウンドは presign で取り込み済みで、オンラインではメッセージのみハッシュ"""
+    message = b"online" * 10
+    pre = presign(key_pair.secret, params, N, M)
+    with instrument.recording() as rec:
+        sign_presigned(message, pre)
+    assert rec.counters["hash_bytes"] == 4 + len(message)
+
+
+def test_presigner_pool(params, key_pair):
+    """プールから取り出した分と、空のときその場で作った分を数える"""
+    with Presigner(
+        key_pair.secret, params, N, M, size=2, background=False
+    ) as pool:
+        assert pool.available == 0
+        sig = pool.sign(b"miss")
+        assert (pool.hits, pool.misses) == (0, 1)
+        assert pool.fill() == 2 and pool.available == 2
+        sigs = [pool.sign(b"hit"), pool.sign(b"hit")]
+        assert (pool.hits, pool.available) == (2, 0)
+    assert verify_signature(sig, b"miss", params, key_pair.public)
+    # 同じメッセージでも salt と開示は毎回異なる
+    assert sigs[0].salt != sigs[1].salt
+    assert all(
+        verify_signature(s, b"hit", params, key_pair.public) for s in sigs
+    )
+    with pytest.raises(ValueError):
+        pool.sign(b"closed")
+
+
+def test_presigner_background(params, key_pair):
+    """バックグラウンドで補充され、close で停止・破棄される"""
+    pool = Presigner(key_pair.secret, params, N, M, size=2)
+    sig = pool.sign(b"bg", block=True, timeout=30)
+    assert pool.hits == 1
+    assert verify_signature(sig, b"bg", params, key_pair.public)
+    pool.close()
+    assert pool.closed and pool.available == 0
+
+
+def test_presigner_rejects_invalid_arguments(params, key_pair):
+    """不正な引数は補充を始める前に ValueError"""
+    with pytest.raises(ValueError):
+        Presigner(key_pair.secret, params, 6, M, mode="hypercube")
+    with pytest.raises(ValueError):
+        Presigner(key_pair.secret, params, N, M, executor="thread")
+    with pytest.raises(ValueError):
+        Presigner(key_pair.secret, params, N, M, size=0)
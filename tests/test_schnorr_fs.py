@@ -0,0 +1,72 @@
+import pytest
+
+from src.finite_field import Fq
+from src.group import GroupElement, generate_parameters
+from src.schnorr_fs import (
+    Signature,
+    compute_challenge,
+    keygen,
+    sign,
+    verify,
+    verify_batch,
+)
+
+
+@pytest.fixture(scope="module")
+def params():
+    return generate_parameters(q_bits=64)
+
+
+@pytest.fixture(scope="module")
+def items(params):
+    """複数の鍵で署名した (y, メッセージ, 署名) の列"""
+    keys = [keygen(params) for _ in range(3)]
+    result = []
+    for i in range(40):
+        kp = keys[i % 3]
+        message = b"message %d" % i
+        result.append((kp.y, message, sign(params, kp.x, kp.y, message)))
+    return result
+
+
+def test_verify(params, items):
+    y, message, sig = items[0]
+    assert verify(params, y, message, sig)
+    assert not verify(params, y, b"other", sig)
+
+
+def test_verify_batch_success(params, items):
+    assert verify_batch(params, items).ok
+
+
+def test_verify_batch_finds_invalid(params, items):
+    """一括検証失敗時に不正な署名のインデックスを正確に特定"""
+    tampered = list(items)
+    y, message, sig = tampered[5]
+    tampered[5] = (y, message, Signature(sig.u, sig.c, sig.z + Fq(1, params.q)))
+    y, message, sig = tampered[17]
+    tampered[17] = (y, b"tampered", sig)
+    y, message, sig = tampered[30]
+    tampered[30] = (y, message, Signature(sig.u * params.g, sig.c, sig.z))
+
+    result = verify_batch(params, tampered)
+    assert not result.ok
+    assert result.invalid == [5, 17, 30]
+
+
+def test_verify_batch_rejects_small_order_component(params, items):
+    """
+    u に位数 2 の成分 (-1) を持つ署名は、重みによらず一括検証でも不正と
+    特定される (verify と同じ結果)
+    """
+    kp = keygen(params)
+    message = b"small order"
+    r = Fq.random(params.q)
+    u = params.g_pow(r) * GroupElement(params.p - 1, params.g.ctx)
+    c = compute_challenge(params, kp.y, u, message)
+    forged = (kp.y, message, Signature(u, c, r + c * kp.x))
+    assert not verify(params, *forged)
+    for _ in range(8):
+        assert verify_batch(params, list(items) + [forged]).invalid == [
+            len(items)
+        ]
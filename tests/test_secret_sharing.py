@@ -0,0 +1,40 @@
+import secrets
+
+import pytest
+
+from src.finite_field import Fq, FqArray
+from src.group import generate_parameters
+from src.secret_sharing import SHARE_SEED_LEN, FieldShare
+
+
+def test_seeded_sharing_is_deterministic():
+    """同じ seed からは同じシェア、異なる seed からは異なるシェア"""
+    q = 2**61 - 1
+    seed = secrets.token_bytes(SHARE_SEED_LEN)
+    a = FieldShare.additive_secret_sharing(42, 64, q, seed=seed)
+    b = FieldShare.additive_secret_sharing(42, 64, q, seed=seed)
+    c = FieldShare.additive_secret_sharing(42, 64, q, seed=bytes(32))
+
+    assert isinstance(a.shares, FqArray) and len(a.shares) == 64
+    assert a == b and a != c
+    assert a.reconstruct() == c.reconstruct() == 42
+
+    with pytest.raises(ValueError):
+        FieldShare.additive_secret_sharing(42, 64, q, seed=b"short")
+
+
+def test_list_shares_are_converted():
+    q = 101
+    share = FieldShare(shares=[Fq(3, q), Fq(99, q)], q=q)
+    assert share.shares == FqArray.from_list([Fq(3, q), Fq(99, q)])
+    assert share.reconstruct() == 1
+
+
+def test_exp_with_table_and_element():
+    """表・元のどちらで持ち上げても積は g^secret"""
+    params = generate_parameters(q_bits=32)
+    field_share = FieldShare.additive_secret_sharing(42, 16, params.q)
+    by_table = field_share.exp(params.g_table)
+    by_element = field_share.exp(params.g)
+    assert by_table == by_element
+    assert by_table.product() == params.g**42
@@ -0,0 +1,25 @@
+import pytest
+
+from src.seed_tree import SeedTree, tree_depth
+
+
+@pytest.mark.parametrize("n", [2, 5, 8, 256])
+def test_reconstruct_all_but_hidden(n):
+    """兄弟シードから隠した葉以外のすべての葉を復元"""
+    tree = SeedTree.random(n, salt=b"salt", round_index=1)
+    leaves = tree.leaves()
+    for hidden in {0, n // 2, n - 1}:
+        path = tree.open(hidden)
+        assert len(path) == tree_depth(n)
+        rebuilt = SeedTree.reconstruct(path, hidden, n, b"salt", 1)
+        assert rebuilt[hidden] is None
+        assert [s for i, s in enumerate(rebuilt) if i != hidden] == [
+            s for i, s in enumerate(leaves) if i != hidden
+        ]
+
+
+def test_salt_separates_trees():
+    root = bytes(16)
+    tree = SeedTree(root, 4, salt=b"a")
+    assert tree.leaves() == SeedTree(root, 4, salt=b"a").leaves()
+    assert tree.leaves() != SeedTree(root, 4, salt=b"b").leaves()